@@ -0,0 +1,20 @@
+{#
+    Movies whose weekly revenues are out of date, with the first affected week as a
+    yyyyww number: every movie with a daily fact rebuilt since the weekly relation was
+    last built, and every movie such a fact was re-matched away from.
+#}
+{% macro changed_movie_weeks(weekly_relation) -%}
+    SELECT
+        movie_key,
+        MIN(week) AS from_week
+    FROM (
+        SELECT
+            UNNEST([f.movie_key, f.previous_movie_key]) AS movie_key,
+            d.year * 100 + d.week_of_year_iso AS week
+        FROM {{ ref('fct_daily_revenues') }} f
+        JOIN {{ ref('dim_dates') }} d ON f.date_key = d.date_key
+        WHERE f.dbt_updated_at > (SELECT MAX(dbt_updated_at) FROM {{ weekly_relation }})
+    )
+    WHERE movie_key IS NOT NULL
+    GROUP BY movie_key
+{%- endmacro %}
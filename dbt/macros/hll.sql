@@ -0,0 +1,54 @@
+{#
+    HyperLogLog sketches for distinct counts that can be maintained incrementally.
+    A sketch is a dense UTINYINT[] of 2^precision registers, built by reducing each
+    value's hll_register/hll_rank with MAX per register. Sketches of two row sets
+    merge with an element-wise max, so each run only has to sketch its delta. Values
+    are hashed with md5 rather than hash() so stored sketches survive DuckDB upgrades;
+    changing the precision invalidates them.
+#}
+
+{% macro hll_precision() -%}
+    10
+{%- endmacro %}
+
+{% macro hll_register(column) -%}
+    {%- set p = hll_precision() | int -%}
+    md5_number_lower({{ column }}::VARCHAR) & {{ 2 ** p - 1 }}
+{%- endmacro %}
+
+{% macro hll_rank(column) -%}
+    {%- set p = hll_precision() | int -%}
+    ({{ 64 - p + 1 }} - LENGTH(BIN(md5_number_lower({{ column }}::VARCHAR) >> {{ p }})))::UTINYINT
+{%- endmacro %}
+
+{% macro hll_sketch(register, rank) -%}
+    {%- set m = 2 ** (hll_precision() | int) -%}
+    list_transform(
+        range({{ m }}),
+        i -> COALESCE(MAP(LIST({{ register }}), LIST({{ rank }}))[i][1], 0)::UTINYINT
+    )
+{%- endmacro %}
+
+{% macro hll_merge(left, right) -%}
+    {%- set m = 2 ** (hll_precision() | int) -%}
+    CASE
+        WHEN {{ left }} IS NULL THEN {{ right }}
+        WHEN {{ right }} IS NULL THEN {{ left }}
+        ELSE list_transform(range(1, {{ m + 1 }}), i -> GREATEST({{ left }}[i], {{ right }}[i]))
+    END
+{%- endmacro %}
+
+{% macro hll_estimate(sketch) -%}
+    {%- set m = 2 ** (hll_precision() | int) -%}
+    {%- set raw_estimate -%}
+        ({{ 0.7213 / (1 + 1.079 / m) * m * m }} / list_sum(list_transform({{ sketch }}, r -> POW(2, -r))))
+    {%- endset -%}
+    {%- set empty_registers = "LEN(list_filter(" ~ sketch ~ ", r -> r = 0))" -%}
+    ROUND(
+        CASE
+            WHEN {{ raw_estimate }} <= {{ 2.5 * m }} AND {{ empty_registers }} > 0
+            THEN {{ m }} * LN({{ m }} / {{ empty_registers }})
+            ELSE {{ raw_estimate }}
+        END
+    )::BIGINT
+{%- endmacro %}
@@ -0,0 +1,12 @@
+{#
+    Integer surrogate keys. Dates use their yyyymmdd number, so facts can derive
+    date_key without a lookup; everything else takes the first 60 bits of the same
+    MD5 that dbt_utils.generate_surrogate_key produces, which fits a positive BIGINT.
+#}
+{% macro date_key(column) -%}
+    CAST(EXTRACT(YEAR FROM {{ column }}) * 10000 + EXTRACT(MONTH FROM {{ column }}) * 100 + EXTRACT(DAY FROM {{ column }}) AS INTEGER)
+{%- endmacro %}
+
+{% macro hash_key(field_list) -%}
+    CAST('0x' || LEFT({{ dbt_utils.generate_surrogate_key(field_list) }}, 15) AS BIGINT)
+{%- endmacro %}
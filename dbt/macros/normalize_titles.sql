@@ -0,0 +1,30 @@
+{#
+    Selects (title, clean_title) for every row of `relation`. This is the only place
+    titles are normalized; models should read clean titles from stg_title_lookup and
+    only call this for titles the lookup has not seen yet.
+#}
+{% macro normalize_titles(relation, column='title') %}
+    {%- set year_pattern = '(19\d{2}|20\d{2})' -%}
+    {%- set rerelease_pattern = '\s*(Re-release|Remaster|IMAX|3D|4K|HD)' -%}
+    {%- set anniversary_pattern = '\s*\d+(\s*th|\s*st|\s*nd|\s*rd)?\s*(Year\s*)?Anniversary' -%}
+    SELECT
+        title,
+        LOWER(TRIM(step6)) AS clean_title
+    FROM (
+        SELECT
+            {{ column }}::VARCHAR AS title,
+            REGEXP_REPLACE(title, '{{ rerelease_pattern }}.*$', '') AS step1,
+            REGEXP_REPLACE(step1, '{{ anniversary_pattern }}.*$', '') AS step2,
+            CASE
+                WHEN REGEXP_MATCHES(step2, '^\(.*\)$') THEN step2
+                ELSE REGEXP_REPLACE(step2, '\s*\([^)]*\)$', '')
+            END AS step3,
+            REGEXP_REPLACE(step3, '[^\w\s\-:'''']', ' ') AS step4,
+            REGEXP_REPLACE(step4, '\s+', ' ') AS step5,
+            CASE
+                WHEN REGEXP_MATCHES(step5, '^{{ year_pattern }}$') THEN step5
+                ELSE REGEXP_REPLACE(step5, '\s+{{ year_pattern }}$', '')
+            END AS step6
+        FROM {{ relation }}
+    )
+{% endmacro %}
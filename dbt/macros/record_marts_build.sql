@@ -0,0 +1,29 @@
+{#
+    Appends a row to marts_builds whenever an invocation successfully builds a model
+    in the marts schema. Its build_id is the data version that readers of the marts
+    (the dashboard cache in particular) key their results on.
+#}
+{% macro record_marts_build(results) -%}
+    {%- if execute -%}
+        {%- set marts_schema = target.schema ~ '_marts' -%}
+        {%- set built_models = [] -%}
+        {%- for result in results -%}
+            {%- if result.node.resource_type == 'model'
+                and result.node.schema == marts_schema
+                and result.status == 'success' -%}
+                {%- do built_models.append(result.node.name) -%}
+            {%- endif -%}
+        {%- endfor -%}
+        {%- if built_models -%}
+            {%- do run_query(
+                "CREATE TABLE IF NOT EXISTS " ~ marts_schema ~ ".marts_builds ("
+                ~ "build_id VARCHAR, built_at TIMESTAMP WITH TIME ZONE, models VARCHAR[])"
+            ) -%}
+            {%- do run_query(
+                "INSERT INTO " ~ marts_schema ~ ".marts_builds VALUES ('"
+                ~ invocation_id ~ "', current_timestamp, ['" ~ built_models | join("', '") ~ "'])"
+            ) -%}
+            {%- do log('Recorded marts build ' ~ invocation_id, info=True) -%}
+        {%- endif -%}
+    {%- endif -%}
+{%- endmacro %}
@@ -0,0 +1,10 @@
+{#
+    Distinct character trigrams of a title, padded so that word starts and ends
+    form their own grams. Used as blocking keys when matching titles.
+#}
+{% macro title_trigrams(column) -%}
+    list_distinct(list_transform(
+        range(1, length('  ' || {{ column }} || ' ') - 1),
+        i -> substr('  ' || {{ column }} || ' ', i::BIGINT, 3)
+    ))
+{%- endmacro %}
@@ -50,7 +50,7 @@ enhanced_dates AS (
 )
 
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['date_day']) }} AS date_key,
+    {{ date_key('date_day') }} AS date_key,
     date_day AS date,
     year,
     month,
@@ -1,59 +1,131 @@
 {{ config(
-    materialized='table',
+    materialized='incremental',
     alias='dim_movies',
+    unique_key='movie_version_key',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns',
     indexes=[
+        {'columns': ['movie_version_key']},
         {'columns': ['movie_key']},
         {'columns': ['imdb_id']},
         {'columns': ['clean_title']}
     ]
 ) }}
 
-{%- set json_columns = [
-    'imdbID', 'Title', 'Year', 'Rated', 'Released', 'Runtime',
-    'Director', 'Actors', 'BoxOffice', 'imdbRating', 'imdbVotes'
-] -%}
+-- Type 2 dimension: movie_key is derived from imdb_id alone and never changes, while
+-- every change to the OMDb payload adds a version with its own validity range. Facts
+-- join the current version, so refreshing OMDb data does not re-key them.
 
+{%- set tracked_columns = [
+    'title', 'clean_title', 'year', 'rated', 'released_date', 'runtime_minutes',
+    'directors', 'actors', 'box_office_total', 'imdb_rating', 'imdb_votes'
+] %}
+
+-- stg_omdb_movies is parsed from the OMDb JSON when it is fetched, so this model only
+-- projects typed columns and adds the normalized title.
 WITH source_data AS (
-    SELECT * FROM {{ source('staging', 'stg_omdb_raw_data') }}
+    SELECT * FROM {{ source('staging', 'stg_omdb_movies') }}
+    WHERE year IS NOT NULL
+    {% if is_incremental() %}
+        AND last_updated >= (SELECT MAX(valid_from) FROM {{ this }})
+    {% endif %}
 ),
 
-extracted_data AS (
+looked_up_titles AS (
     SELECT
-        {%- for column in json_columns %}
-        data->>'{{ column }}' AS {{ column | lower }},
-        {%- endfor %}
-        last_updated
-    FROM source_data
+        ot.title,
+        l.clean_title
+    FROM (SELECT DISTINCT title FROM source_data) ot
+    LEFT JOIN {{ ref('stg_title_lookup') }} l ON ot.title = l.title
+),
+
+unseen_titles AS (
+    SELECT title
+    FROM looked_up_titles
+    WHERE clean_title IS NULL
+),
+
+-- Same normalization as the box-office titles, so clean_title joins line up.
+clean_titles AS (
+    SELECT title, clean_title
+    FROM looked_up_titles
+    WHERE clean_title IS NOT NULL
+    UNION ALL
+    {{ normalize_titles('unseen_titles') }}
 ),
 
-transformed_data AS (
+versions AS (
     SELECT
         *,
-        TRIM(REGEXP_REPLACE(LOWER(title), '[^a-zA-Z0-9 ]', '')) AS clean_title,
-        TRY_CAST(year AS INTEGER) AS year_int,
-        TRY_CAST(released AS DATE) AS released_date,
-        TRY_CAST(REGEXP_EXTRACT(runtime, '(\d+)') AS INTEGER) AS runtime_minutes,
-        TRY_CAST(REPLACE(REPLACE(boxoffice, '$', ''), ',', '') AS DECIMAL(18,2)) AS box_office_total,
-        TRY_CAST(imdbrating AS DECIMAL(3,1)) AS imdb_rating_num,
-        TRY_CAST(REPLACE(imdbvotes, ',', '') AS INTEGER) AS imdb_votes_int
-    FROM extracted_data
-    WHERE REGEXP_MATCHES(year, '^\d{4}$')
+        {{ dbt_utils.generate_surrogate_key(tracked_columns) }} AS payload_hash
+    FROM (
+        SELECT
+            sd.*,
+            ct.clean_title
+        FROM source_data sd
+        LEFT JOIN clean_titles ct ON sd.title = ct.title
+    )
+),
+
+{% if is_incremental() %}
+current_versions AS (
+    SELECT *
+    FROM {{ this }}
+    WHERE is_current
+),
+
+-- Refreshes that return the same payload leave the current version untouched.
+changed_versions AS (
+    SELECT v.*
+    FROM versions v
+    LEFT JOIN current_versions c ON v.imdb_id = c.imdb_id
+    WHERE c.imdb_id IS NULL OR c.payload_hash <> v.payload_hash
+),
+
+closed_versions AS (
+    SELECT c.* REPLACE (
+        cv.last_updated AS valid_to,
+        FALSE AS is_current,
+        current_timestamp AS dbt_updated_at
+    )
+    FROM current_versions c
+    JOIN changed_versions cv ON c.imdb_id = cv.imdb_id
+    -- A second change on the same day replaces the version instead of closing it.
+    WHERE c.valid_from < cv.last_updated
+),
+{% else %}
+changed_versions AS (
+    SELECT * FROM versions
+),
+{% endif %}
+
+new_versions AS (
+    SELECT
+        {{ hash_key(['imdb_id']) }} AS movie_key,
+        {{ hash_key(['imdb_id', 'last_updated']) }} AS movie_version_key,
+        imdb_id,
+        title,
+        clean_title,
+        year,
+        rated,
+        released_date,
+        runtime_minutes,
+        directors,
+        actors,
+        box_office_total,
+        imdb_rating,
+        imdb_votes,
+        last_updated,
+        payload_hash,
+        last_updated AS valid_from,
+        CAST(NULL AS DATE) AS valid_to,
+        TRUE AS is_current,
+        current_timestamp AS dbt_updated_at
+    FROM changed_versions
 )
 
-SELECT
-    {{ dbt_utils.generate_surrogate_key(['imdbid', 'last_updated']) }} AS movie_key,
-    imdbid AS imdb_id,
-    title,
-    clean_title,
-    year_int AS year,
-    rated,
-    released_date,
-    runtime_minutes,
-    director,
-    actors,
-    box_office_total,
-    imdb_rating_num AS imdb_rating,
-    imdb_votes_int AS imdb_votes,
-    last_updated,
-    current_timestamp AS dbt_updated_at
-FROM transformed_data
\ No newline at end of file
+SELECT * FROM new_versions
+{% if is_incremental() %}
+UNION ALL BY NAME
+SELECT * FROM closed_versions
+{% endif %}
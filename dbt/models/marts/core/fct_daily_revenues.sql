@@ -1,6 +1,9 @@
 {{ config(
-    materialized='table',
+    materialized='incremental',
     alias='fct_daily_revenues',
+    unique_key='revenue_key',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns',
     indexes=[
         {'columns': ['revenue_key']},
         {'columns': ['date_key']},
@@ -22,16 +25,68 @@ WITH source_data AS (
         s.theaters,
         s.clean_title,
         s.distributor,
-        d.date_key,
+        s.etl_updated_at,
+        {{ date_key('s.date') }} AS date_key,
         m.movie_key,
+        -- Titles without an OMDb match get a window partition of their own instead
+        -- of sharing one NULL partition.
+        CASE WHEN m.movie_key IS NULL THEN s.clean_title END AS unmatched_title,
+        tm.matched_at AS title_matched_at,
         dist.distributor_key,
         m.released_date
     FROM {{ ref('stg_revenue_per_day') }} s
-    LEFT JOIN {{ ref('dim_dates') }} d ON s.date = d.date
-    LEFT JOIN {{ ref('dim_movies') }} m ON s.clean_title = m.clean_title
+    LEFT JOIN {{ ref('int_title_matches') }} tm ON s.clean_title = tm.clean_title
+    LEFT JOIN {{ ref('dim_movies') }} m ON tm.imdb_id = m.imdb_id AND m.is_current
     LEFT JOIN {{ ref('dim_distributors') }} dist ON s.distributor = dist.distributor
 ),
 
+{% if is_incremental() %}
+-- LAG/LEAD/ROW_NUMBER only change for movies that received staging rows or whose
+-- titles were re-matched since the last build. Every row of those movies is
+-- recomputed and replaces the stored one on revenue_key. movie_key is stable across
+-- OMDb refreshes; only a changed release date (days_since_release) touches a movie.
+last_build AS (
+    SELECT
+        MAX(stg_loaded_at) AS stg_loaded_at,
+        MAX(dbt_updated_at) AS built_at
+    FROM {{ this }}
+),
+
+release_date_changes AS (
+    SELECT cur.movie_key
+    FROM {{ ref('dim_movies') }} cur
+    JOIN {{ ref('dim_movies') }} prev
+        ON cur.movie_key = prev.movie_key
+        AND prev.valid_to = cur.valid_from
+    CROSS JOIN last_build
+    WHERE cur.is_current
+        AND cur.valid_from >= CAST(last_build.built_at AS DATE)
+        AND cur.released_date IS DISTINCT FROM prev.released_date
+),
+
+touched_movies AS (
+    SELECT DISTINCT movie_key, unmatched_title
+    FROM source_data, last_build
+    WHERE source_data.etl_updated_at > last_build.stg_loaded_at
+        OR source_data.title_matched_at > last_build.built_at
+    UNION
+    SELECT movie_key, NULL AS unmatched_title
+    FROM release_date_changes
+),
+
+scoped_data AS (
+    SELECT sd.*
+    FROM source_data sd
+    SEMI JOIN touched_movies tm
+        ON sd.movie_key IS NOT DISTINCT FROM tm.movie_key
+        AND sd.unmatched_title IS NOT DISTINCT FROM tm.unmatched_title
+),
+{% else %}
+scoped_data AS (
+    SELECT * FROM source_data
+),
+{% endif %}
+
 daily_metrics AS (
     SELECT
         *,
@@ -39,30 +94,47 @@ daily_metrics AS (
             WHEN theaters > 0 THEN revenue / theaters
             ELSE 0
         END AS revenue_per_theater,
-        LAG(revenue) OVER (PARTITION BY movie_key ORDER BY date) AS prev_day_revenue,
-        LEAD(revenue) OVER (PARTITION BY movie_key ORDER BY date) AS next_day_revenue,
-        ROW_NUMBER() OVER (PARTITION BY movie_key ORDER BY date) AS day_number
-    FROM source_data
+        LAG(revenue) OVER (PARTITION BY movie_key, unmatched_title ORDER BY date) AS prev_day_revenue,
+        LEAD(revenue) OVER (PARTITION BY movie_key, unmatched_title ORDER BY date) AS next_day_revenue,
+        ROW_NUMBER() OVER (PARTITION BY movie_key, unmatched_title ORDER BY date) AS day_number
+    FROM scoped_data
+),
+
+new_rows AS (
+    SELECT
+        {{ hash_key(['id', 'date']) }} AS revenue_key,
+        date_key,
+        movie_key,
+        distributor_key,
+        revenue,
+        theaters,
+        date AS revenue_date,
+        revenue_per_theater,
+        CASE
+            WHEN prev_day_revenue IS NOT NULL THEN (revenue - prev_day_revenue) / prev_day_revenue
+            ELSE NULL
+        END AS day_over_day_change,
+        CASE
+            WHEN revenue > 0 AND next_day_revenue IS NOT NULL THEN 1 - (next_day_revenue / revenue)
+            ELSE NULL
+        END AS drop_percentage,
+        day_number,
+        DATEDIFF('day', released_date, date) AS days_since_release,
+        etl_updated_at AS stg_loaded_at,
+        current_timestamp AS dbt_updated_at
+    FROM daily_metrics
 )
 
+-- previous_movie_key is the movie a rebuilt row was attributed to before its title was
+-- re-matched to another one, so the weekly facts can recompute the movie it left.
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['id', 'date']) }} AS revenue_key,
-    date_key,
-    movie_key,
-    distributor_key,
-    revenue,
-    theaters,
-    date AS revenue_date,
-    revenue_per_theater,
-    CASE
-        WHEN prev_day_revenue IS NOT NULL THEN (revenue - prev_day_revenue) / prev_day_revenue
-        ELSE NULL
-    END AS day_over_day_change,
-    CASE
-        WHEN revenue > 0 AND next_day_revenue IS NOT NULL THEN 1 - (next_day_revenue / revenue)
-        ELSE NULL
-    END AS drop_percentage,
-    day_number,
-    DATEDIFF('day', released_date, date) AS days_since_release,
-    current_timestamp AS dbt_updated_at
-FROM daily_metrics
\ No newline at end of file
+    n.*,
+    {% if is_incremental() %}
+    CASE WHEN p.movie_key IS DISTINCT FROM n.movie_key THEN p.movie_key END AS previous_movie_key
+    {% else %}
+    CAST(NULL AS BIGINT) AS previous_movie_key
+    {% endif %}
+FROM new_rows n
+{% if is_incremental() %}
+LEFT JOIN {{ this }} p ON n.revenue_key = p.revenue_key
+{% endif %}
@@ -1,6 +1,9 @@
 {{ config(
-    materialized='table',
+    materialized='incremental',
     alias='fct_weekly_revenues',
+    unique_key='weekly_revenue_key',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns',
     indexes=[
         {'columns': ['weekly_revenue_key']},
         {'columns': ['movie_key']},
@@ -9,21 +12,187 @@
     partition_by={
         'field': 'year',
         'data_type': 'int'
-    }
+    },
+    pre_hook=[
+        "{% if is_incremental() %}DELETE FROM {{ this }} w USING ({{ changed_movie_weeks(this) }}) c WHERE w.movie_key = c.movie_key AND w.year * 100 + w.week_of_year_iso >= c.from_week{% endif %}"
+    ],
+    post_hook=[
+        "DELETE FROM {{ this }} w WHERE NOT EXISTS (SELECT 1 FROM {{ ref('dim_movies') }} m WHERE m.movie_key = w.movie_key)"
+    ]
 ) }}
 
-WITH source_data AS (
-    SELECT * FROM {{ ref('int_weekly_revenues') }}
+WITH
+{% if is_incremental() %}
+-- Movies with daily rows rebuilt since the last build, or left by rows a title re-match
+-- moved to another movie, are recomputed from the first week holding such a row; weeks
+-- before it are already final. The pre-hook has deleted their stored weeks from there
+-- on, so weeks that no longer hold any daily row do not survive.
+changed_movies AS (
+    {{ changed_movie_weeks(this) }}
+),
+
+-- Movies without stored weeks, and movies whose release date changed (which shifts
+-- week_number_since_release), are built over their whole run.
+new_movies AS (
+    SELECT
+        m.movie_key,
+        0 AS from_week
+    FROM {{ ref('dim_movies') }} m
+    ANTI JOIN (SELECT DISTINCT movie_key FROM {{ this }}) w ON m.movie_key = w.movie_key
+    WHERE m.is_current
+    UNION ALL
+    SELECT
+        w.movie_key,
+        0 AS from_week
+    FROM (SELECT DISTINCT movie_key, released_date FROM {{ this }}) w
+    JOIN {{ ref('dim_movies') }} m ON w.movie_key = m.movie_key AND m.is_current
+    WHERE w.released_date IS DISTINCT FROM m.released_date
+),
+
+touched_movies AS (
+    SELECT
+        movie_key,
+        MIN(from_week) AS from_week
+    FROM (
+        SELECT * FROM changed_movies
+        UNION ALL
+        SELECT * FROM new_movies
+    )
+    GROUP BY movie_key
+),
+
+-- The last stored week before the recomputed range anchors the windows: it supplies
+-- the previous week for LAG and the running total, and is re-emitted with its
+-- LEAD-based drop refreshed.
+anchor_weeks AS (
+    SELECT w.*
+    FROM {{ this }} w
+    JOIN touched_movies t
+        ON w.movie_key = t.movie_key
+        AND w.year * 100 + w.week_of_year_iso < t.from_week
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY w.movie_key ORDER BY w.year DESC, w.week_of_year_iso DESC
+    ) = 1
+),
+{% endif %}
+
+daily_data AS (
+    SELECT
+        f.movie_key,
+        d.year,
+        d.week_of_year_iso,
+        f.revenue,
+        f.theaters,
+        d.date,
+        f.stg_loaded_at
+    FROM {{ ref('fct_daily_revenues') }} f
+    JOIN {{ ref('dim_dates') }} d ON f.date_key = d.date_key
+    {% if is_incremental() %}
+    JOIN touched_movies t
+        ON f.movie_key = t.movie_key
+        AND d.year * 100 + d.week_of_year_iso >= t.from_week
+    {% endif %}
+),
+
+weekly_aggregates AS (
+    SELECT
+        movie_key,
+        year,
+        week_of_year_iso,
+        SUM(revenue) AS weekly_revenue,
+        AVG(theaters) AS avg_weekly_theaters,
+        MIN(date) AS week_start_date,
+        MAX(date) AS week_end_date,
+        COUNT(DISTINCT date) AS days_in_week,
+        MIN(CASE WHEN revenue > 0 THEN date END) AS first_revenue_date,
+        MAX(CASE WHEN revenue > 0 THEN date END) AS last_revenue_date,
+        SUM(CASE WHEN theaters > 0 THEN 1 ELSE 0 END) AS days_in_theaters,
+        MAX(stg_loaded_at) AS daily_loaded_at
+    FROM daily_data
+    GROUP BY movie_key, year, week_of_year_iso
+),
+
+new_weeks AS (
+    SELECT
+        wa.*,
+        ROUND(wa.weekly_revenue / NULLIF(wa.avg_weekly_theaters, 0), 2) AS avg_revenue_per_theater,
+        m.released_date,
+        CASE
+            WHEN wa.week_start_date = m.released_date THEN 1
+            ELSE DATEDIFF('week', m.released_date, wa.week_start_date) + 1
+        END AS week_number_since_release
+    FROM weekly_aggregates wa
+    JOIN {{ ref('dim_movies') }} m ON wa.movie_key = m.movie_key AND m.is_current
+),
+
+weekly_rows AS (
+    SELECT
+        movie_key,
+        year,
+        week_of_year_iso,
+        week_number_since_release,
+        weekly_revenue,
+        avg_weekly_theaters,
+        avg_revenue_per_theater,
+        days_in_week,
+        days_in_theaters,
+        week_start_date,
+        week_end_date,
+        first_revenue_date,
+        last_revenue_date,
+        released_date,
+        CASE
+            WHEN week_number_since_release = 1 THEN 'Opening Week'
+            WHEN week_number_since_release <= 4 THEN 'Early Weeks'
+            WHEN week_number_since_release <= 8 THEN 'Mid Run'
+            ELSE 'Late Run'
+        END AS run_stage,
+        daily_loaded_at,
+        FALSE AS is_anchor,
+        NULL AS stored_previous_week_revenue,
+        NULL AS stored_theater_change_percentage,
+        0 AS stored_cumulative_revenue
+    FROM new_weeks
+    {% if is_incremental() %}
+    UNION ALL
+    SELECT
+        movie_key,
+        year,
+        week_of_year_iso,
+        week_number_since_release,
+        weekly_revenue,
+        weekly_theaters,
+        revenue_per_theater,
+        days_in_week,
+        days_in_theaters,
+        week_start_date,
+        week_end_date,
+        first_revenue_date,
+        last_revenue_date,
+        released_date,
+        run_stage,
+        daily_loaded_at,
+        TRUE AS is_anchor,
+        previous_week_revenue,
+        theater_change_percentage,
+        cumulative_revenue - weekly_revenue
+    FROM anchor_weeks
+    {% endif %}
 ),
 
 weekly_metrics AS (
     SELECT
         *,
-        LAG(weekly_revenue) OVER (PARTITION BY movie_key ORDER BY year, week_of_year_iso) AS previous_week_revenue,
-        LAG(avg_weekly_theaters) OVER (PARTITION BY movie_key ORDER BY year, week_of_year_iso) AS previous_week_theaters,
-        LEAD(weekly_revenue) OVER (PARTITION BY movie_key ORDER BY year, week_of_year_iso) AS next_week_revenue,
-        SUM(weekly_revenue) OVER (PARTITION BY movie_key ORDER BY year, week_of_year_iso ROWS UNBOUNDED PRECEDING) AS cumulative_revenue
-    FROM source_data
+        COALESCE(
+            LAG(weekly_revenue) OVER movie_weeks, stored_previous_week_revenue
+        ) AS previous_week_revenue,
+        LAG(avg_weekly_theaters) OVER movie_weeks AS previous_week_theaters,
+        LEAD(weekly_revenue) OVER movie_weeks AS next_week_revenue,
+        -- Running totals continue from the anchor's stored cumulative revenue.
+        MAX(stored_cumulative_revenue) OVER (PARTITION BY movie_key)
+            + SUM(weekly_revenue) OVER (movie_weeks ROWS UNBOUNDED PRECEDING) AS cumulative_revenue
+    FROM weekly_rows
+    WINDOW movie_weeks AS (PARTITION BY movie_key ORDER BY year, week_of_year_iso)
 ),
 
 calculated_metrics AS (
@@ -35,6 +204,7 @@ calculated_metrics AS (
             ELSE (weekly_revenue - previous_week_revenue) / previous_week_revenue
         END AS revenue_change_percentage,
         CASE
+            WHEN is_anchor THEN stored_theater_change_percentage
             WHEN COALESCE(previous_week_theaters, 0) = 0 THEN NULL
             ELSE (avg_weekly_theaters - previous_week_theaters) / previous_week_theaters
         END AS theater_change_percentage,
@@ -47,7 +217,7 @@ calculated_metrics AS (
 )
 
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['movie_key', 'year', 'week_of_year_iso']) }} AS weekly_revenue_key,
+    {{ hash_key(['movie_key', 'year', 'week_of_year_iso']) }} AS weekly_revenue_key,
     movie_key,
     year,
     week_of_year_iso,
@@ -77,5 +247,6 @@ SELECT
         WHEN drop_percentage < 0 THEN 'Growth'
         ELSE 'Unknown'
     END AS performance_category,
+    daily_loaded_at,
     current_timestamp AS dbt_updated_at
-FROM calculated_metrics
\ No newline at end of file
+FROM calculated_metrics
@@ -0,0 +1,85 @@
+{{ config(
+    materialized='incremental',
+    alias='int_distributor_stats',
+    unique_key='distributor',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns'
+) }}
+
+-- Running per-distributor aggregates. Each run folds only the staging rows loaded
+-- since the previous one into the stored sums, counts, date range and a HyperLogLog
+-- sketch of distinct movies. Run with --vars '{distributor_stats_exact: true}' (or
+-- --full-refresh) to recompute everything from history, which also replaces the
+-- estimated movie counts with exact ones until the next incremental run.
+
+{%- set exact = var('distributor_stats_exact', false) or not is_incremental() %}
+
+WITH delta AS (
+    SELECT
+        distributor,
+        id,
+        date,
+        revenue,
+        etl_updated_at
+    FROM {{ ref('stg_revenue_per_day') }}
+    WHERE distributor IS NOT NULL
+    {% if not exact %}
+        AND etl_updated_at > (SELECT MAX(loaded_at) FROM {{ this }})
+    {% endif %}
+),
+
+delta_stats AS (
+    SELECT
+        distributor,
+        COUNT(revenue) AS revenue_rows,
+        COALESCE(SUM(revenue), 0) AS total_revenue,
+        MIN(date) AS first_appearance_date,
+        MAX(date) AS last_appearance_date,
+        {% if exact %}
+        COUNT(DISTINCT id) AS exact_movies,
+        {% else %}
+        CAST(NULL AS BIGINT) AS exact_movies,
+        {% endif %}
+        MAX(etl_updated_at) AS loaded_at
+    FROM delta
+    GROUP BY distributor
+),
+
+delta_sketches AS (
+    SELECT
+        distributor,
+        {{ hll_sketch('register', 'rank') }} AS movie_sketch
+    FROM (
+        SELECT
+            distributor,
+            {{ hll_register('id') }} AS register,
+            MAX({{ hll_rank('id') }}) AS rank
+        FROM delta
+        GROUP BY distributor, register
+    )
+    GROUP BY distributor
+)
+
+SELECT
+    ds.distributor,
+    {% if exact %}
+    ds.revenue_rows,
+    ds.total_revenue,
+    ds.first_appearance_date,
+    ds.last_appearance_date,
+    sk.movie_sketch,
+    {% else %}
+    ds.revenue_rows + COALESCE(s.revenue_rows, 0) AS revenue_rows,
+    ds.total_revenue + COALESCE(s.total_revenue, 0) AS total_revenue,
+    LEAST(ds.first_appearance_date, s.first_appearance_date) AS first_appearance_date,
+    GREATEST(ds.last_appearance_date, s.last_appearance_date) AS last_appearance_date,
+    {{ hll_merge('s.movie_sketch', 'sk.movie_sketch') }} AS movie_sketch,
+    {% endif %}
+    ds.exact_movies,
+    ds.loaded_at,
+    current_timestamp AS dbt_updated_at
+FROM delta_stats ds
+JOIN delta_sketches sk ON ds.distributor = sk.distributor
+{% if not exact %}
+LEFT JOIN {{ this }} s ON ds.distributor = s.distributor
+{% endif %}
@@ -0,0 +1,211 @@
+{{ config(
+    materialized='incremental',
+    alias='int_title_matches',
+    unique_key='clean_title',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns',
+    indexes=[
+        {'columns': ['clean_title']},
+        {'columns': ['imdb_id']}
+    ]
+) }}
+
+-- Maps every box-office clean_title to at most one OMDb imdb_id, so facts can resolve
+-- movies with an equi-join. Candidates are blocked on shared title trigrams, scored
+-- with Jaro-Winkler similarity and disambiguated by release year. Unmatched titles
+-- are kept with a NULL imdb_id so they are retried when nearby OMDb records arrive.
+
+{%- set min_similarity = var('title_match_min_similarity', 0.93) %}
+{%- set max_block_size = var('title_match_max_block_size', 500) %}
+
+WITH movies AS (
+    SELECT
+        imdb_id,
+        clean_title,
+        year,
+        imdb_votes,
+        valid_from,
+        {{ title_trigrams('clean_title') }} AS title_trigrams
+    FROM {{ ref('dim_movies') }}
+    WHERE is_current AND clean_title IS NOT NULL AND clean_title <> ''
+),
+
+movie_trigrams AS (
+    SELECT
+        imdb_id,
+        UNNEST(title_trigrams) AS trigram
+    FROM movies
+),
+
+-- Trigrams shared by too many movies ("the", " th") make blocks that are too large
+-- to be useful; exact title matches are found separately.
+blocking_trigrams AS (
+    SELECT trigram
+    FROM movie_trigrams
+    GROUP BY trigram
+    HAVING COUNT(*) <= {{ max_block_size }}
+),
+
+{% if is_incremental() %}
+last_match AS (
+    SELECT MAX(matched_at) AS matched_at
+    FROM {{ this }}
+),
+
+new_titles AS (
+    SELECT
+        s.clean_title,
+        MIN(s.date) AS first_revenue_date
+    FROM {{ ref('stg_revenue_per_day') }} s
+    CROSS JOIN last_match
+    WHERE s.etl_updated_at > last_match.matched_at
+        AND s.clean_title IS NOT NULL
+    GROUP BY s.clean_title
+),
+
+-- Only new movies and versions that changed a matched attribute can move a match;
+-- other OMDb refreshes leave the stored matches (and the facts built on them) alone.
+changed_movies AS (
+    SELECT m.*
+    FROM movies m
+    CROSS JOIN last_match
+    LEFT JOIN {{ ref('dim_movies') }} prev
+        ON m.imdb_id = prev.imdb_id
+        AND prev.valid_to = m.valid_from
+    WHERE m.valid_from >= CAST(last_match.matched_at AS DATE)
+        AND (
+            prev.imdb_id IS NULL
+            OR prev.clean_title IS DISTINCT FROM m.clean_title
+            OR prev.year IS DISTINCT FROM m.year
+        )
+),
+
+changed_trigrams AS (
+    SELECT DISTINCT mt.trigram
+    FROM movie_trigrams mt
+    SEMI JOIN changed_movies cm ON mt.imdb_id = cm.imdb_id
+    SEMI JOIN blocking_trigrams bt ON mt.trigram = bt.trigram
+),
+
+-- Stored titles that share a block or a title with a new or changed OMDb record
+-- may now have a better candidate.
+affected_titles AS (
+    SELECT clean_title
+    FROM (
+        SELECT clean_title, UNNEST(title_trigrams) AS trigram
+        FROM {{ this }}
+    ) t
+    SEMI JOIN changed_trigrams ct ON t.trigram = ct.trigram
+    UNION
+    SELECT t.clean_title
+    FROM {{ this }} t
+    SEMI JOIN changed_movies cm ON t.clean_title = cm.clean_title
+),
+
+titles AS (
+    SELECT
+        nt.clean_title,
+        nt.first_revenue_date,
+        {{ title_trigrams('nt.clean_title') }} AS title_trigrams
+    FROM new_titles nt
+    ANTI JOIN {{ this }} t ON nt.clean_title = t.clean_title
+    UNION ALL
+    SELECT
+        t.clean_title,
+        t.first_revenue_date,
+        t.title_trigrams
+    FROM {{ this }} t
+    SEMI JOIN affected_titles a ON t.clean_title = a.clean_title
+),
+{% else %}
+titles AS (
+    SELECT
+        clean_title,
+        MIN(date) AS first_revenue_date,
+        {{ title_trigrams('clean_title') }} AS title_trigrams
+    FROM {{ ref('stg_revenue_per_day') }}
+    WHERE clean_title IS NOT NULL
+    GROUP BY clean_title
+),
+{% endif %}
+
+exact_candidates AS (
+    SELECT
+        t.clean_title,
+        m.imdb_id,
+        1.0 AS similarity,
+        'exact' AS match_method
+    FROM titles t
+    JOIN movies m ON t.clean_title = m.clean_title
+),
+
+blocked_pairs AS (
+    SELECT
+        t.clean_title,
+        mt.imdb_id,
+        COUNT(*) AS shared_trigrams
+    FROM (
+        SELECT clean_title, UNNEST(title_trigrams) AS trigram
+        FROM titles
+    ) t
+    JOIN movie_trigrams mt ON t.trigram = mt.trigram
+    SEMI JOIN blocking_trigrams bt ON t.trigram = bt.trigram
+    GROUP BY t.clean_title, mt.imdb_id
+),
+
+fuzzy_candidates AS (
+    SELECT
+        bp.clean_title,
+        bp.imdb_id,
+        jaro_winkler_similarity(bp.clean_title, m.clean_title) AS similarity,
+        'fuzzy' AS match_method
+    FROM blocked_pairs bp
+    JOIN titles t ON bp.clean_title = t.clean_title
+    JOIN movies m ON bp.imdb_id = m.imdb_id
+    WHERE bp.clean_title <> m.clean_title
+        -- Cheap overlap filter before the string comparison.
+        AND bp.shared_trigrams >= 0.5 * LEAST(LEN(t.title_trigrams), LEN(m.title_trigrams))
+        -- Sequels and remakes differ in little more than a number.
+        AND REGEXP_EXTRACT_ALL(bp.clean_title, '\d+') = REGEXP_EXTRACT_ALL(m.clean_title, '\d+')
+),
+
+scored_candidates AS (
+    SELECT
+        c.clean_title,
+        c.imdb_id,
+        c.similarity,
+        c.match_method,
+        ABS(EXTRACT(YEAR FROM t.first_revenue_date) - m.year) AS year_distance,
+        m.imdb_votes
+    FROM (
+        SELECT * FROM exact_candidates
+        UNION ALL
+        SELECT * FROM fuzzy_candidates
+        WHERE similarity >= {{ min_similarity }}
+    ) c
+    JOIN titles t ON c.clean_title = t.clean_title
+    JOIN movies m ON c.imdb_id = m.imdb_id
+    -- Fuzzy matches must also agree on the release year; exact titles are kept for
+    -- re-releases and only ranked by it.
+    WHERE c.match_method = 'exact' OR ABS(EXTRACT(YEAR FROM t.first_revenue_date) - m.year) <= 1
+),
+
+best_matches AS (
+    SELECT *
+    FROM scored_candidates
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY clean_title
+        ORDER BY similarity DESC, year_distance ASC NULLS LAST, imdb_votes DESC NULLS LAST, imdb_id
+    ) = 1
+)
+
+SELECT
+    t.clean_title,
+    bm.imdb_id,
+    bm.similarity AS match_score,
+    COALESCE(bm.match_method, 'unmatched') AS match_method,
+    t.first_revenue_date,
+    t.title_trigrams,
+    current_timestamp AS matched_at
+FROM titles t
+LEFT JOIN best_matches bm ON t.clean_title = bm.clean_title
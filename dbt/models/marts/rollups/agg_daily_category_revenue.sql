@@ -0,0 +1,58 @@
+{{ config(
+    materialized='incremental',
+    alias='agg_daily_category_revenue',
+    unique_key='revenue_date',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns'
+) }}
+
+-- Daily revenue totals per distributor category for the dashboard trend chart.
+-- Revenue per theater is kept as a sum and a count so averages stay exact when
+-- categories are combined. An incremental run recomputes whole days: those holding
+-- a fact row rebuilt since the last run, and every day of a distributor whose
+-- category has changed since, found through the distributor keys stored per row.
+
+WITH facts AS (
+    SELECT
+        f.revenue_date,
+        f.distributor_key,
+        dist.distributor_category,
+        f.revenue,
+        f.revenue_per_theater
+    FROM {{ ref('fct_daily_revenues') }} f
+    JOIN {{ ref('dim_distributors') }} dist ON f.distributor_key = dist.distributor_key
+),
+
+{% if is_incremental() %}
+changed_days AS (
+    SELECT revenue_date
+    FROM {{ ref('fct_daily_revenues') }}
+    WHERE dbt_updated_at > (SELECT MAX(dbt_updated_at) FROM {{ this }})
+    UNION ALL
+    SELECT t.revenue_date
+    FROM {{ this }} t, UNNEST(t.distributor_keys) AS u(distributor_key)
+    JOIN {{ ref('dim_distributors') }} dist ON u.distributor_key = dist.distributor_key
+    WHERE dist.distributor_category IS DISTINCT FROM t.distributor_category
+),
+{% endif %}
+
+scoped_facts AS (
+    SELECT *
+    FROM facts
+    {% if is_incremental() %}
+    SEMI JOIN changed_days USING (revenue_date)
+    {% endif %}
+)
+
+SELECT
+    revenue_date,
+    distributor_category,
+    SUM(revenue) AS revenue,
+    SUM(revenue_per_theater) AS revenue_per_theater_sum,
+    COUNT(revenue_per_theater) AS revenue_per_theater_count,
+    COUNT(*) AS revenue_rows,
+    LIST(DISTINCT distributor_key ORDER BY distributor_key) AS distributor_keys,
+    current_timestamp AS dbt_updated_at
+FROM scoped_facts
+GROUP BY revenue_date, distributor_category
+ORDER BY revenue_date, distributor_category
@@ -0,0 +1,75 @@
+{{ config(
+    materialized='incremental',
+    alias='agg_movie_revenue_by_period',
+    unique_key=['period_grain', 'period_start'],
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns'
+) }}
+
+-- Revenue per movie by calendar day, ISO week, month and year, so the dashboard can
+-- rank movies over any date range by summing a handful of whole periods instead of
+-- scanning the daily facts. An incremental run recomputes every period that holds a
+-- fact row rebuilt since the last run, for all movies, so rows that moved to another
+-- movie_key leave no stale totals behind.
+
+{%- set grains = ['day', 'week', 'month', 'year'] %}
+
+WITH facts AS (
+    SELECT
+        revenue_date,
+        movie_key,
+        revenue
+    FROM {{ ref('fct_daily_revenues') }}
+    WHERE movie_key IS NOT NULL
+    {% if is_incremental() %}
+        AND revenue_date >= (
+            -- An ISO week can start in the previous year, so reach back to whichever
+            -- of the week or the year of the earliest rebuilt fact starts first.
+            SELECT CAST(LEAST(
+                DATE_TRUNC('week', MIN(revenue_date)), DATE_TRUNC('year', MIN(revenue_date))
+            ) AS DATE)
+            FROM {{ ref('fct_daily_revenues') }}
+            WHERE dbt_updated_at > (SELECT MAX(dbt_updated_at) FROM {{ this }})
+        )
+    {% endif %}
+),
+
+{% if is_incremental() %}
+changed_facts AS (
+    SELECT revenue_date
+    FROM {{ ref('fct_daily_revenues') }}
+    WHERE dbt_updated_at > (SELECT MAX(dbt_updated_at) FROM {{ this }})
+),
+{% endif %}
+
+periods AS (
+    {% for grain in grains %}
+    SELECT
+        '{{ grain }}' AS period_grain,
+        CAST(DATE_TRUNC('{{ grain }}', f.revenue_date) AS DATE) AS period_start,
+        f.movie_key,
+        f.revenue
+    FROM facts f
+    {% if is_incremental() %}
+    SEMI JOIN changed_facts c
+        ON DATE_TRUNC('{{ grain }}', c.revenue_date) = DATE_TRUNC('{{ grain }}', f.revenue_date)
+    {% endif %}
+    {% if not loop.last %}UNION ALL{% endif %}
+    {% endfor %}
+)
+
+SELECT
+    period_grain,
+    period_start,
+    CAST(period_start + CASE period_grain
+        {% for grain in grains %}
+        WHEN '{{ grain }}' THEN INTERVAL 1 {{ grain }}
+        {% endfor %}
+    END AS DATE) - 1 AS period_end,
+    movie_key,
+    SUM(revenue) AS revenue,
+    COUNT(*) AS revenue_rows,
+    current_timestamp AS dbt_updated_at
+FROM periods
+GROUP BY period_grain, period_start, movie_key
+ORDER BY period_grain, period_start
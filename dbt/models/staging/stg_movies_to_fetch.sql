@@ -1,20 +1,23 @@
 {{ config(
-    materialized='table',
+    materialized='incremental',
     alias='stg_movies_to_fetch',
     unique_key='clean_title',
     on_schema_change='sync_all_columns'
 ) }}
 
+-- OMDb fetch history lives in omdb_fetch_state, which the Dagster asset merges
+-- this catalogue into, so rebuilding this model never resets it.
 WITH latest_revenue AS (
     SELECT
         clean_title,
         MAX(date) AS max_date
     FROM {{ ref('stg_revenue_per_day') }}
+    {% if is_incremental() %}
+    WHERE date >= (SELECT MAX(max_date) FROM {{ this }})
+    {% endif %}
     GROUP BY clean_title
 )
 SELECT
     lr.clean_title,
-    lr.max_date,
-    CAST(NULL AS DATE) AS omdb_last_fetched_date,
-    CAST(NULL AS DATE) AS omdb_last_error_date
-FROM latest_revenue lr
\ No newline at end of file
+    lr.max_date
+FROM latest_revenue lr
@@ -0,0 +1,36 @@
+{{ config(
+    materialized='incremental',
+    alias='stg_title_lookup',
+    incremental_strategy='append',
+    on_schema_change='sync_all_columns',
+    index=['title']
+) }}
+
+-- Memoized title -> clean_title mapping. Only distinct titles that are not in the
+-- lookup yet are normalized, so regex work scales with new titles, not revenue rows.
+-- Incremental runs only read raw rows ingested since the lookup last grew; the anti
+-- join below still guards against titles that are already mapped.
+WITH source_titles AS (
+    SELECT DISTINCT title::VARCHAR AS title
+    FROM {{ source('raw', 'raw_revenues_per_day') }}
+    WHERE title IS NOT NULL
+    {% if is_incremental() %}
+        AND ingestion_timestamp > (
+            SELECT COALESCE(MAX(etl_updated_at), '-infinity'::TIMESTAMP) FROM {{ this }}
+        )
+    {% endif %}
+),
+
+new_titles AS (
+    SELECT st.title
+    FROM source_titles st
+    {% if is_incremental() %}
+    ANTI JOIN {{ this }} l ON st.title = l.title
+    {% endif %}
+)
+
+SELECT
+    title,
+    clean_title,
+    current_timestamp AS etl_updated_at
+FROM ({{ normalize_titles('new_titles') }})
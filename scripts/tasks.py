@@ -1,4 +1,7 @@
+import os
+import statistics
 import subprocess
+import sys
 
 
 def run_command(command, check=True):
@@ -27,6 +30,40 @@ def typecheck():
     run_command("mypy .", check=False)
 
 
+def dbt_unit_test():
+    # Unit tests need the relations of the models they cover; an empty build creates
+    # them without reading any data.
+    dbt_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dbt")
+    print("Building empty dbt models...")
+    run_command(f"cd {dbt_dir} && dbt build --empty --exclude-resource-type unit_test")
+    print("Running dbt unit tests...")
+    run_command(f"cd {dbt_dir} && dbt test --select test_type:unit")
+
+
+def benchmark_startup(runs=5):
+    # Each run is a fresh interpreter, like a code-location load or a `dagster dev` reload.
+    budget = float(os.environ.get("STARTUP_BUDGET_SECONDS", "10"))
+    probe = (
+        "import time; start = time.perf_counter(); import src.definitions; "
+        "print(time.perf_counter() - start)"
+    )
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+
+    median = statistics.median(timings)
+    print(
+        f"src.definitions import: first {timings[0]:.2f}s, "
+        f"median {median:.2f}s, best {min(timings):.2f}s over {runs} runs"
+    )
+    if median > budget:
+        print(f"Startup median {median:.2f}s exceeds the {budget:.2f}s budget")
+        sys.exit(1)
+
+
 def check():
     format()
     lint()
@@ -0,0 +1,104 @@
+from typing import Optional
+
+from dagster import AssetExecutionContext, Output
+from dagster_dbt import DagsterDbtTranslator, DbtCliResource, dbt_assets
+
+from ..resources.database import MotherDuckResource
+from ..utils.dbt.helpers import (
+    get_ancestors,
+    load_manifest,
+    load_manifest_index,
+    plan_dbt_build,
+    record_fingerprints,
+    topological_order,
+)
+
+# Set this run tag to "true" to rebuild the selection even if its inputs are unchanged.
+FORCE_BUILD_TAG = "cinemetrics/force_dbt_build"
+
+
+# One multi-asset for the whole dbt project: a materialization of any subset runs as a
+# single `dbt build` invocation, so dbt parses once and runs independent models on its
+# own threads. dagster-dbt passes the selected subset to dbt via --select.
+@dbt_assets(manifest=load_manifest())
+def cinemetrics_dbt_assets(
+    context: AssetExecutionContext, dbt: DbtCliResource, database: MotherDuckResource
+):
+    index = load_manifest_index()
+    translator = DagsterDbtTranslator()
+    unique_id_by_asset_key = {
+        translator.get_asset_key(node): unique_id
+        for unique_id, node in index.manifest["nodes"].items()
+        if node["resource_type"] in ("model", "seed", "snapshot")
+    }
+    selected = [
+        unique_id_by_asset_key[key]
+        for key in context.selected_asset_keys
+        if key in unique_id_by_asset_key
+    ]
+
+    # Models whose inputs fingerprint the same as at their last successful build are
+    # excluded from the dbt invocation.
+    with database.connection() as conn:
+        plan = plan_dbt_build(conn, index, selected)
+    if context.run.tags.get(FORCE_BUILD_TAG) == "true":
+        plan.stale.update(dict.fromkeys(plan.skipped, f"forced by the {FORCE_BUILD_TAG} tag"))
+        plan.skipped.clear()
+    context.log.info(f"dbt build: {len(plan.stale)} stale, {len(plan.skipped)} unchanged")
+
+    # Unchanged models still yield an output, tagged with the skip reason, so that
+    # downstream steps of the run are not skipped. Dagster wants a multi-asset's
+    # outputs in dependency order, so each is held back until just before the first
+    # built model that depends on it, or the end of the build.
+    asset_key_by_unique_id = {unique_id: key for key, unique_id in unique_id_by_asset_key.items()}
+    pending = topological_order(index, list(plan.skipped))
+
+    def release_skipped(before: Optional[str] = None):
+        ancestors = get_ancestors(index, before) if before else None
+        for unique_id in [u for u in pending if ancestors is None or u in ancestors]:
+            pending.remove(unique_id)
+            yield Output(
+                None,
+                output_name=context.assets_def.get_output_name_for_asset_key(
+                    asset_key_by_unique_id[unique_id]
+                ),
+                metadata={
+                    "dbt_skipped": True,
+                    "skip_reason": plan.skipped[unique_id],
+                    "input_fingerprint": plan.fingerprints[unique_id],
+                },
+            )
+
+    if not plan.stale:
+        yield from release_skipped()
+        return
+
+    # Unit tests read the columns of the incremental models they cover, which do not
+    # exist before a first build; they run separately, see scripts/tasks.py.
+    args = ["build", "--exclude-resource-type", "unit_test"]
+    if plan.skipped:
+        args += ["--exclude", *(index.manifest["nodes"][u]["name"] for u in plan.skipped)]
+
+    built = {}
+    try:
+        for event in dbt.cli(args, context=context).stream():
+            if isinstance(event, Output):
+                unique_id = unique_id_by_asset_key.get(
+                    context.asset_key_for_output(event.output_name)
+                )
+                yield from release_skipped(before=unique_id)
+                if unique_id in plan.stale:
+                    built[unique_id] = plan.fingerprints[unique_id]
+                    event = event.with_metadata(
+                        {
+                            **event.metadata,
+                            "build_reason": plan.stale[unique_id],
+                            "input_fingerprint": plan.fingerprints[unique_id],
+                        }
+                    )
+            yield event
+        yield from release_skipped()
+    finally:
+        # Models that built before a failure keep their fingerprints.
+        with database.connection() as conn:
+            record_fingerprints(conn, built)
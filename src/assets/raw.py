@@ -1,6 +1,7 @@
-from datetime import datetime
+import time
+from typing import Optional
 
-from dagster import Config, Output, asset
+from dagster import Config, MetadataValue, Output, asset
 
 from ..resources.database import MotherDuckResource
 from ..utils.raw.helpers import (
@@ -9,6 +10,7 @@ from ..utils.raw.helpers import (
     get_table_structure,
     insert_new_data,
     log_error,
+    plan_ingestion_chunks,
     update_ingestion_log,
 )
 
@@ -16,6 +18,8 @@ from ..utils.raw.helpers import (
 class ExtractRevenueDataConfig(Config):
     source_table: str = "revenues_per_day"
     target_table: str = "raw_revenues_per_day"
+    chunk_size: int = 50000
+    limit: Optional[int] = None
 
 
 @asset(
@@ -32,21 +36,63 @@ def raw_revenues_per_day(context, config: ExtractRevenueDataConfig) -> Output[No
             context.log.info(f"Last processed date: {last_processed_date}")
             table_structure = get_table_structure(conn, f"main.{config.source_table}")
 
-            processed_count = insert_new_data(conn, config, table_structure, last_processed_date)
-
-            if processed_count == 0:
+            chunks = plan_ingestion_chunks(
+                conn, config.source_table, last_processed_date, config.chunk_size
+            )
+            if not chunks:
                 context.log.info("No new revenue data to process.")
                 return Output(None, metadata={"row_count": 0})
 
-            current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            update_ingestion_log(conn, config.source_table, current_date, processed_count)
+            processed_count = 0
+            chunk_stats = []
+            started_at = time.monotonic()
+            for chunk in chunks:
+                if config.limit is not None and processed_count >= config.limit:
+                    context.log.info(f"Row limit of {config.limit} reached, stopping.")
+                    break
+
+                chunk_started_at = time.monotonic()
+                # Data and watermark commit together, so a failed run resumes after
+                # the last committed chunk.
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    inserted = insert_new_data(conn, config, table_structure, chunk)
+                    update_ingestion_log(conn, config.source_table, chunk.end_date, inserted)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+                elapsed = time.monotonic() - chunk_started_at
+                rows_per_second = inserted / elapsed if elapsed > 0 else 0.0
+                processed_count += inserted
+                chunk_stats.append(
+                    {
+                        "start_date": str(chunk.start_date),
+                        "end_date": str(chunk.end_date),
+                        "rows": inserted,
+                        "seconds": round(elapsed, 3),
+                        "rows_per_second": round(rows_per_second, 1),
+                    }
+                )
+                context.log.info(
+                    f"Ingested {inserted} rows for ({chunk.start_date}, {chunk.end_date}] "
+                    f"in {elapsed:.2f}s ({rows_per_second:.0f} rows/s)"
+                )
 
+        total_elapsed = time.monotonic() - started_at
+        last_chunk_date = chunk_stats[-1]["end_date"] if chunk_stats else str(last_processed_date)
         context.log.info(f"Processed {processed_count} new revenue records.")
         return Output(
             None,
             metadata={
                 "row_count": processed_count,
-                "last_processed_date": current_date,
+                "last_processed_date": last_chunk_date,
+                "chunk_count": len(chunk_stats),
+                "rows_per_second": (
+                    round(processed_count / total_elapsed, 1) if total_elapsed > 0 else 0.0
+                ),
+                "chunks": MetadataValue.json(chunk_stats),
             },
         )
     except Exception as e:
@@ -0,0 +1,79 @@
+import os
+
+from dagster import AssetKey, AssetRecordsFilter, DagsterInstance, Output, asset
+from dagster_dbt import DagsterDbtTranslator
+
+from ..resources.database import MotherDuckResource
+from ..utils.dbt.helpers import load_manifest_index
+from ..utils.replica.helpers import REPLICA_SCHEMA, export_replica, get_replica_path
+
+MART_ASSET_KEYS = sorted(
+    (
+        DagsterDbtTranslator().get_asset_key(node)
+        for node in load_manifest_index().manifest["nodes"].values()
+        if node["resource_type"] == "model" and node["schema"] == REPLICA_SCHEMA
+    ),
+    key=lambda key: key.to_user_string(),
+)
+
+
+def _built_since(instance: DagsterInstance, asset_key: AssetKey, timestamp: float) -> bool:
+    records_filter = AssetRecordsFilter(asset_key=asset_key, after_timestamp=timestamp)
+    cursor = None
+    while True:
+        result = instance.fetch_materializations(records_filter, limit=100, cursor=cursor)
+        if any(
+            "dbt_skipped" not in record.asset_materialization.metadata for record in result.records
+        ):
+            return True
+        if not result.has_more:
+            return False
+        cursor = result.cursor
+
+
+@asset(
+    deps=MART_ASSET_KEYS,
+    compute_kind="duckdb",
+    group_name="serving",
+    description="Local DuckDB copy of the marts that the Streamlit dashboard reads from",
+    required_resource_keys={"database"},
+)
+def marts_replica(context) -> Output[None]:
+    database: MotherDuckResource = context.resources.database
+    path = get_replica_path()
+
+    # The replica is only stale once a mart has been built after the last sync. Marts
+    # whose dbt build was skipped as unchanged still materialize, flagged dbt_skipped.
+    last_sync = context.instance.get_latest_materialization_event(context.asset_key)
+    if (
+        os.path.exists(path)
+        and last_sync is not None
+        and not any(
+            _built_since(context.instance, asset_key, last_sync.timestamp)
+            for asset_key in MART_ASSET_KEYS
+        )
+    ):
+        context.log.info("No mart built since the last sync, keeping the replica.")
+        return Output(
+            None,
+            metadata={
+                "path": path,
+                "skipped": True,
+                "skip_reason": "no mart built since the last sync",
+            },
+        )
+
+    with database.connection() as conn:
+        row_counts = export_replica(conn, path)
+    context.log.info(f"Synced {len(row_counts)} {REPLICA_SCHEMA} tables to {path}")
+
+    return Output(
+        None,
+        metadata={
+            "path": path,
+            "tables": len(row_counts),
+            "row_count": sum(row_counts.values()),
+            "size_bytes": os.path.getsize(path),
+            **{f"rows_{table}": count for table, count in row_counts.items()},
+        },
+    )
@@ -1,27 +1,17 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from dagster import AssetExecutionContext, Output, asset
-from dagster_dbt import DbtCliResource, dbt_assets
 
 from ..resources.external import APILimitReachedException
 from ..utils.staging.helpers import (
-    get_titles_to_fetch,
+    get_api_usage,
     initialize_tables,
     process_movies,
+    sync_fetch_state,
     update_api_usage_log,
 )
 
 
-@dbt_assets(manifest="dbt/target/manifest.json", select="stg_revenue_per_day")
-def stg_revenue_per_day(context: AssetExecutionContext, dbt: DbtCliResource):
-    yield from dbt.cli(["run", "--select", "stg_revenue_per_day"], context=context).stream()
-
-
-@dbt_assets(manifest="dbt/target/manifest.json", select="stg_movies_to_fetch")
-def stg_movies_to_fetch(context: AssetExecutionContext, dbt: DbtCliResource):
-    yield from dbt.cli(["run", "--select", "stg_movies_to_fetch"], context=context).stream()
-
-
 @asset(
     deps=["stg_movies_to_fetch"],
     compute_kind="python",
@@ -33,21 +23,43 @@ async def stg_omdb_raw_data(context: AssetExecutionContext) -> Output[None]:
     omdb_api = context.resources.omdb_api
     database = context.resources.database
     current_date = datetime.now().date()
-    seven_days_ago = current_date - timedelta(days=7)
 
     try:
         await database.run_async(initialize_tables, database)
-        titles_to_fetch = await database.run_async(get_titles_to_fetch, database, seven_days_ago)
+        new_titles = await database.run_async(sync_fetch_state, database)
+        context.log.info(f"Added {new_titles} new titles to the OMDb fetch state")
+        requests_used_today = await database.run_async(get_api_usage, database, current_date)
+        rate_limiter = omdb_api.configure_rate_limiter(requests_used_today)
+        context.log.info(f"OMDb requests remaining today: {rate_limiter.budget.remaining}")
 
         async with omdb_api.get_session() as session:
             processed_count, total_requests = await process_movies(
-                context, omdb_api, database, session, titles_to_fetch, current_date
+                context, omdb_api, database, session, current_date
             )
 
         await database.run_async(update_api_usage_log, database, current_date, total_requests)
         context.log.info(f"Fetched and updated data for {processed_count} movies")
 
-        return Output(None, metadata={"movies_fetched": processed_count})
+        metadata = {
+            "movies_fetched": processed_count,
+            "api_requests": total_requests,
+            "api_budget_remaining": rate_limiter.budget.remaining,
+            "final_concurrency": rate_limiter.concurrency.current_limit,
+        }
+        cache = omdb_api.get_cache()
+        if cache is not None:
+            stats = cache.stats
+            metadata.update(
+                {
+                    "cache_hits": stats.hits,
+                    "cache_negative_hits": stats.negative_hits,
+                    "cache_misses": stats.misses,
+                    "cache_hit_rate": round(stats.hit_rate, 4),
+                    "cache_evictions": stats.evictions,
+                }
+            )
+
+        return Output(None, metadata=metadata)
     except APILimitReachedException as e:
         context.log.warning(f"API Limit reached: {str(e)}")
         context.log.info("API limit reached. Stopping further processing.")
@@ -11,7 +11,7 @@ from dagster import (
 from dagster_dbt import DbtCliResource
 from dagster_duckdb_pandas import DuckDBPandasIOManager
 
-from src.assets import marts, raw, staging
+from src.assets import dbt_models, raw, replica, staging
 from src.resources.database import MotherDuckResource
 from src.resources.external import OMDbAPIResource
 from src.sensors.data import create_new_revenue_data_sensor
@@ -22,7 +22,8 @@ DBT_ROOT = os.path.join(PROJECT_ROOT, "dbt")
 all_assets = [
     *load_assets_from_modules([raw]),
     *load_assets_from_modules([staging]),
-    *load_assets_from_modules([marts]),
+    *load_assets_from_modules([dbt_models]),
+    *load_assets_from_modules([replica]),
 ]
 
 jobs = {
@@ -35,6 +36,7 @@ jobs = {
     "staging_job": define_asset_job(
         "staging_job",
         selection=AssetSelection.assets(
+            "stg_title_lookup",
             "stg_revenue_per_day",
             "stg_movies_to_fetch",
             "stg_omdb_raw_data",
@@ -44,10 +46,15 @@ jobs = {
         "marts_job",
         selection=AssetSelection.assets(
             "marts/dim_dates",
+            "marts/int_distributor_stats",
             "marts/dim_distributors",
             "marts/dim_movies",
+            "marts/int_title_matches",
             "marts/fct_daily_revenues",
             "marts/fct_weekly_revenues",
+            "marts/agg_movie_revenue_by_period",
+            "marts/agg_daily_category_revenue",
+            "marts_replica",
         ),
     ),
     "full_refresh_job": define_asset_job(
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    payload: Optional[Dict[str, Any]]
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    negative_hits: int
+    misses: int
+    writes: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / lookups if lookups else 0.0
+
+
+class OMDbResponseCache:
+    """SQLite-backed cache of OMDb responses keyed on normalized request params.
+
+    Found movies and "not found" answers are cached with separate TTLs, and the
+    least recently used entries are evicted once the cache outgrows max_entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        hit_ttl_seconds: float,
+        miss_ttl_seconds: float,
+        max_entries: int,
+    ):
+        self.hit_ttl_seconds = hit_ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self.max_entries = max_entries
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS omdb_responses (
+                cache_key TEXT PRIMARY KEY,
+                payload TEXT,
+                expires_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_omdb_responses_last_accessed
+            ON omdb_responses(last_accessed)
+            """
+        )
+        self._conn.execute("DELETE FROM omdb_responses WHERE expires_at <= ?", [time.time()])
+        self._entry_count = self._conn.execute("SELECT COUNT(*) FROM omdb_responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        normalized = {
+            name.lower(): " ".join(str(value).lower().split())
+            for name, value in params.items()
+            if name.lower() != "apikey"
+        }
+        return json.dumps(normalized, sort_keys=True)
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self._hits, self._negative_hits, self._misses, self._writes, self._evictions
+        )
+
+    def get(self, params: Dict[str, Any]) -> Optional[CachedResponse]:
+        key = self.make_key(params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM omdb_responses WHERE cache_key = ? AND expires_at > ?",
+                [key, now],
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE omdb_responses SET last_accessed = ? WHERE cache_key = ?", [now, key]
+            )
+            if row[0] is None:
+                self._negative_hits += 1
+                return CachedResponse(None)
+            self._hits += 1
+            return CachedResponse(json.loads(row[0]))
+
+    def set(self, params: Dict[str, Any], payload: Optional[Dict[str, Any]]):
+        ttl = self.hit_ttl_seconds if payload is not None else self.miss_ttl_seconds
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO omdb_responses (cache_key, payload, expires_at, last_accessed)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                payload = excluded.payload,
+                expires_at = excluded.expires_at,
+                last_accessed = excluded.last_accessed
+                """,
+                [
+                    self.make_key(params),
+                    json.dumps(payload) if payload is not None else None,
+                    now + ttl,
+                    now,
+                ],
+            )
+            self._writes += 1
+            # Updates are counted too; _evict recounts before deleting anything.
+            self._entry_count += 1
+            if self._entry_count > self.max_entries:
+                self._evict()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        self._entry_count = self._conn.execute("SELECT COUNT(*) FROM omdb_responses").fetchone()[0]
+        overflow = self._entry_count - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            """
+            DELETE FROM omdb_responses WHERE cache_key IN (
+                SELECT cache_key FROM omdb_responses ORDER BY last_accessed LIMIT ?
+            )
+            """,
+            [overflow],
+        )
+        self._entry_count -= overflow
+        self._evictions += overflow
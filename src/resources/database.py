@@ -1,9 +1,166 @@
 import asyncio
+import threading
 import time
 from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
 
 import duckdb
-from dagster import ConfigurableResource
+from dagster import ConfigurableResource, InitResourceContext
+from pydantic import PrivateAttr
+
+
+class PoolTimeoutError(TimeoutError):
+    """No pooled connection was released within the acquire timeout."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"No pooled DuckDB connection became available within {timeout}s")
+
+
+class PoolClosedError(RuntimeError):
+    """The pool was used after close()."""
+
+    def __init__(self):
+        super().__init__("Connection pool is closed")
+
+
+@dataclass
+class PooledCursor:
+    cursor: duckdb.DuckDBPyConnection
+    generation: int
+    created_at: float = field(default_factory=time.monotonic)
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class DuckDBConnectionPool:
+    """Hands out cursors of one long-lived DuckDB connection.
+
+    Opening a MotherDuck connection costs a network handshake, while a cursor
+    of an open connection is a cheap local handle that is safe to use from its
+    own thread. The pool keeps the parent connection open, reuses idle cursors,
+    caps how many are checked out at once and drops handles that have gone stale.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], duckdb.DuckDBPyConnection],
+        max_size: int = 8,
+        max_idle_seconds: float = 300,
+        max_lifetime_seconds: float = 3600,
+        health_check_interval: float = 30,
+        acquire_timeout: float = 60,
+    ):
+        self._connect = connect
+        self._max_idle_seconds = max_idle_seconds
+        self._max_lifetime_seconds = max_lifetime_seconds
+        self._health_check_interval = health_check_interval
+        self._acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: List[PooledCursor] = []
+        self._parent: Optional[duckdb.DuckDBPyConnection] = None
+        self._generation = 0
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        pooled = self.acquire()
+        discard = False
+        try:
+            yield pooled.cursor
+        except BaseException:
+            # The cursor may be left inside an aborted transaction; a fresh one is cheap.
+            discard = True
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def acquire(self) -> PooledCursor:
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise PoolTimeoutError(self._acquire_timeout)
+        try:
+            return self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled: PooledCursor, discard: bool = False):
+        try:
+            with self._lock:
+                if discard or self._closed or pooled.generation != self._generation:
+                    _close_quietly(pooled.cursor)
+                else:
+                    pooled.released_at = time.monotonic()
+                    self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._reset_parent()
+
+    def _checkout(self) -> PooledCursor:
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolClosedError()
+                candidate = self._idle.pop() if self._idle else None
+                if candidate is None:
+                    return self._new_cursor()
+
+            now = time.monotonic()
+            if (
+                now - candidate.released_at > self._max_idle_seconds
+                or now - candidate.created_at > self._max_lifetime_seconds
+            ):
+                _close_quietly(candidate.cursor)
+                continue
+            if now - candidate.released_at < self._health_check_interval or _is_healthy(
+                candidate.cursor
+            ):
+                return candidate
+
+            # A dead cursor means the parent connection is gone as well.
+            _close_quietly(candidate.cursor)
+            with self._lock:
+                if candidate.generation == self._generation:
+                    self._reset_parent()
+
+    def _new_cursor(self) -> PooledCursor:
+        if self._parent is None:
+            self._parent = self._connect()
+            self._generation += 1
+        try:
+            return PooledCursor(self._parent.cursor(), self._generation)
+        except duckdb.Error:
+            self._reset_parent()
+            self._parent = self._connect()
+            self._generation += 1
+            return PooledCursor(self._parent.cursor(), self._generation)
+
+    def _reset_parent(self):
+        for pooled in self._idle:
+            _close_quietly(pooled.cursor)
+        self._idle.clear()
+        if self._parent is not None:
+            _close_quietly(self._parent)
+            self._parent = None
+
+
+def _is_healthy(cursor: duckdb.DuckDBPyConnection) -> bool:
+    try:
+        cursor.execute("SELECT 1").fetchone()
+    except Exception:
+        return False
+    return True
+
+
+def _close_quietly(conn: duckdb.DuckDBPyConnection):
+    try:
+        conn.close()
+    except Exception:
+        pass
 
 
 class MotherDuckResource(ConfigurableResource):
@@ -11,6 +168,18 @@ class MotherDuckResource(ConfigurableResource):
     token: str
     max_retries: int = 3
     retry_delay: int = 1
+    pool_size: int = 8
+    pool_max_idle_seconds: int = 300
+    pool_max_lifetime_seconds: int = 3600
+
+    _pool: Optional[DuckDBConnectionPool] = PrivateAttr(default=None)
+    _pool_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def setup_for_execution(self, context: InitResourceContext) -> None:
+        self.get_pool()
+
+    def teardown_after_execution(self, context: InitResourceContext) -> None:
+        self.close_pool()
 
     def get_connection(self):
         for attempt in range(self.max_retries):
@@ -21,13 +190,27 @@ class MotherDuckResource(ConfigurableResource):
                     raise
                 time.sleep(self.retry_delay)
 
+    def get_pool(self) -> DuckDBConnectionPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = DuckDBConnectionPool(
+                    self.get_connection,
+                    max_size=self.pool_size,
+                    max_idle_seconds=self.pool_max_idle_seconds,
+                    max_lifetime_seconds=self.pool_max_lifetime_seconds,
+                )
+            return self._pool
+
+    def close_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
     @contextmanager
     def connection(self):
-        conn = self.get_connection()
-        try:
+        with self.get_pool().connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
     def query(self, sql, params=None):
         with self.connection() as conn:
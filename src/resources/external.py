@@ -1,8 +1,13 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
 from typing import Dict, Optional
 
 import aiohttp
-from dagster import ConfigurableResource
+from dagster import ConfigurableResource, InitResourceContext
+from pydantic import PrivateAttr
+
+from .cache import OMDbResponseCache
 
 
 class APILimitReachedException(Exception):
@@ -11,43 +16,282 @@ class APILimitReachedException(Exception):
     pass
 
 
+class DailyBudgetExhaustedException(APILimitReachedException):
+    """Exception indicating that the configured daily request budget is used up."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Daily request budget of {limit} requests has been used up.")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DailyRequestBudget:
+    def __init__(self, limit: int, used: int = 0):
+        self.limit = limit
+        self.used = used
+        self._exhausted = False
+
+    @property
+    def remaining(self) -> int:
+        if self._exhausted:
+            return 0
+        return max(self.limit - self.used, 0)
+
+    def reserve(self):
+        if self.remaining == 0:
+            raise DailyBudgetExhaustedException(self.limit)
+        self.used += 1
+
+    def refund(self):
+        self.used -= 1
+
+    def exhaust(self):
+        self._exhausted = True
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight requests.
+
+    The limit grows by roughly one slot per round of fast responses and is cut
+    back when responses get slow or the API starts throttling.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        target_latency: float,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.decrease_cooldown = decrease_cooldown
+        self.limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def release(self, latency: Optional[float], throttled: bool):
+        async with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._decrease(0.5)
+            elif latency is not None and latency > self.target_latency:
+                self._decrease(0.9)
+            elif latency is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+
+
+class RequestPermit:
+    def __init__(self):
+        self.throttled = False
+
+
+class OMDbRateLimiter:
+    def __init__(
+        self,
+        requests_per_second: float,
+        burst_size: int,
+        daily_request_limit: int,
+        requests_used_today: int,
+        initial_concurrency: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        target_latency: float,
+    ):
+        self.bucket = TokenBucket(requests_per_second, burst_size)
+        self.budget = DailyRequestBudget(daily_request_limit, requests_used_today)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial_concurrency, min_concurrency, max_concurrency, target_latency
+        )
+        self.requests_sent = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.budget.remaining == 0
+
+    def exhaust(self):
+        self.budget.exhaust()
+
+    @asynccontextmanager
+    async def request(self):
+        await self.concurrency.acquire()
+        permit = RequestPermit()
+        reserved = False
+        started_at = None
+        try:
+            self.budget.reserve()
+            reserved = True
+            await self.bucket.acquire()
+            started_at = time.monotonic()
+            self.requests_sent += 1
+            yield permit
+        finally:
+            if started_at is None:
+                if reserved:
+                    self.budget.refund()
+                latency = None
+            else:
+                latency = time.monotonic() - started_at
+            await self.concurrency.release(latency, permit.throttled)
+
+
 class OMDbAPIResource(ConfigurableResource):
     api_key: str
     base_url: str = "http://www.omdbapi.com/"
     timeout: int = 10
+    requests_per_second: float = 5.0
+    burst_size: int = 10
+    daily_request_limit: int = 1000
+    initial_concurrency: int = 10
+    min_concurrency: int = 1
+    max_concurrency: int = 20
+    target_latency_seconds: float = 2.0
+    max_throttle_retries: int = 3
+    cache_enabled: bool = True
+    cache_path: str = "dagster_home/omdb_cache.sqlite"
+    cache_hit_ttl_days: int = 30
+    cache_miss_ttl_days: int = 7
+    cache_max_entries: int = 100_000
+
+    _rate_limiter: Optional[OMDbRateLimiter] = PrivateAttr(default=None)
+    _cache: Optional[OMDbResponseCache] = PrivateAttr(default=None)
+
+    def teardown_after_execution(self, context: InitResourceContext) -> None:
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    def configure_rate_limiter(self, requests_used_today: int = 0) -> OMDbRateLimiter:
+        self._rate_limiter = OMDbRateLimiter(
+            requests_per_second=self.requests_per_second,
+            burst_size=self.burst_size,
+            daily_request_limit=self.daily_request_limit,
+            requests_used_today=requests_used_today,
+            initial_concurrency=self.initial_concurrency,
+            min_concurrency=self.min_concurrency,
+            max_concurrency=self.max_concurrency,
+            target_latency=self.target_latency_seconds,
+        )
+        return self._rate_limiter
+
+    def get_rate_limiter(self) -> OMDbRateLimiter:
+        if self._rate_limiter is None:
+            return self.configure_rate_limiter()
+        return self._rate_limiter
+
+    def get_cache(self) -> Optional[OMDbResponseCache]:
+        if self.cache_enabled and self._cache is None:
+            self._cache = OMDbResponseCache(
+                self.cache_path,
+                hit_ttl_seconds=self.cache_hit_ttl_days * 86400,
+                miss_ttl_seconds=self.cache_miss_ttl_days * 86400,
+                max_entries=self.cache_max_entries,
+            )
+        return self._cache
 
     async def fetch_movie_data(
         self, context, session: aiohttp.ClientSession, title: str
     ) -> Optional[Dict]:
         params = {"apikey": self.api_key, "t": title, "plot": "full"}
-        try:
-            async with session.get(self.base_url, params=params, timeout=self.timeout) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("Response") == "True":
-                        return data
-                    elif data.get("Error") == "Request limit reached!":
-                        context.log.info("API request limit reached.")
-                        raise APILimitReachedException("API request limit reached.")
-                    else:
-                        context.log.warning(f"No data found for movie: {title}")
-                        return None
-                elif response.status == 401:
-                    context.log.info("API key is invalid or daily limit has been reached.")
-                    raise APILimitReachedException(
-                        "API key is invalid or daily limit has been reached."
-                    )
-                else:
-                    context.log.error(f"Error fetching data for {title}: HTTP {response.status}")
+        cache = self.get_cache()
+        if cache is not None:
+            # SQLite I/O under the cache lock would stall every in-flight request.
+            cached = await asyncio.to_thread(cache.get, params)
+            if cached is not None:
+                return cached.payload
+
+        limiter = self.get_rate_limiter()
+        for attempt in range(self.max_throttle_retries + 1):
+            async with limiter.request() as permit:
+                try:
+                    async with session.get(
+                        self.base_url, params=params, timeout=self.timeout
+                    ) as response:
+                        if response.status == 200:
+                            data = await response.json()
+                            if data.get("Response") == "True":
+                                if cache is not None:
+                                    await asyncio.to_thread(cache.set, params, data)
+                                return data
+                            elif data.get("Error") == "Request limit reached!":
+                                context.log.info("API request limit reached.")
+                                limiter.exhaust()
+                                raise APILimitReachedException("API request limit reached.")
+                            else:
+                                context.log.warning(f"No data found for movie: {title}")
+                                if cache is not None:
+                                    await asyncio.to_thread(cache.set, params, None)
+                                return None
+                        elif response.status == 401:
+                            context.log.info("API key is invalid or daily limit has been reached.")
+                            limiter.exhaust()
+                            raise APILimitReachedException(
+                                "API key is invalid or daily limit has been reached."
+                            )
+                        elif response.status == 429:
+                            permit.throttled = True
+                            context.log.warning(f"Throttled while fetching data for {title}")
+                        else:
+                            context.log.error(
+                                f"Error fetching data for {title}: HTTP {response.status}"
+                            )
+                            return None
+                except APILimitReachedException:
+                    raise
+                except asyncio.TimeoutError:
+                    permit.throttled = True
+                    context.log.warning(f"Timeout fetching data for {title}")
+                    return None
+                except aiohttp.ClientError as e:
+                    context.log.error(f"Network error fetching data for {title}: {str(e)}")
                     return None
-        except APILimitReachedException:
-            raise
-        except aiohttp.ClientError as e:
-            context.log.error(f"Network error fetching data for {title}: {str(e)}")
-            return None
-        except Exception as e:
-            context.log.error(f"Unexpected error fetching data for {title}: {str(e)}")
-            return None
+                except Exception as e:
+                    context.log.error(f"Unexpected error fetching data for {title}: {str(e)}")
+                    return None
+            await asyncio.sleep(2**attempt)
+
+        context.log.error(f"Giving up on {title} after {self.max_throttle_retries} retries")
+        return None
 
     @asynccontextmanager
     async def get_session(self):
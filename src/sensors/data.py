@@ -1,29 +1,42 @@
-from dagster import RunConfig, RunRequest, SensorResult, sensor
+from dagster import RunRequest, SensorResult, sensor
 
+from ..resources.database import MotherDuckResource
+from ..utils.raw.helpers import get_last_ingested_date
+
+
+def create_new_revenue_data_sensor(job, minimum_interval_seconds: int = 30):
+    @sensor(job=job, minimum_interval_seconds=minimum_interval_seconds)
+    def new_revenue_data_sensor(context, database: MotherDuckResource):
+        # The cursor holds the highest source date already handed to a run, so each
+        # tick is a MAX() over the rows past it instead of a full-table COUNT(*).
+        with database.connection() as conn:
+            high_water_mark = context.cursor
+            if high_water_mark is None:
+                high_water_mark = str(get_last_ingested_date(conn, "revenues_per_day"))[:10]
 
-def create_new_revenue_data_sensor(job):
-    @sensor(job=job)
-    def new_revenue_data_sensor(context):
-        with context.resources.database.get_connection() as conn:
             result = conn.execute(
                 """
-                SELECT COUNT(*) as new_count
-                FROM main.revenues_per_day r
-                LEFT JOIN raw_ingestion_log l ON l.source_table = 'revenues_per_day'
-                WHERE r.date > COALESCE(l.last_ingested_date, '1900-01-01')
-            """
+                SELECT MAX(date) AS max_date
+                FROM main.revenues_per_day
+                WHERE date > ?::DATE
+            """,
+                [high_water_mark],
             ).fetchone()
 
-        new_count = result[0] if result else 0
+        new_max_date = result[0] if result else None
 
-        if new_count > 0:
-            return RunRequest(
-                run_key=f"new_revenue_data_{new_count}",
-                run_config=RunConfig(
-                    ops={"raw_revenues_per_day": {"config": {"limit": min(new_count, 10000)}}}
-                ),
+        if new_max_date is not None:
+            new_high_water_mark = str(new_max_date)[:10]
+            return SensorResult(
+                run_requests=[
+                    RunRequest(
+                        run_key=f"new_revenue_data_{new_high_water_mark}",
+                        tags={"revenue_high_water_mark": new_high_water_mark},
+                    )
+                ],
+                cursor=new_high_water_mark,
             )
 
-        return SensorResult(skip_reason="No new revenue data available")
+        return SensorResult(skip_reason="No new revenue data available", cursor=high_water_mark)
 
     return new_revenue_data_sensor
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import shutil
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+import pyarrow as pa
+
+from ...resources.cache import CacheStats
+
+
+class ArrowIPCStore:
+    """Arrow tables on disk as IPC files, one directory per data version.
+
+    Files are read back memory-mapped, so a restarted process, or a second one sharing
+    the directory, serves results straight from the page cache without re-running or
+    deserializing anything. Directories of superseded versions are pruned.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, version: str, key: Hashable) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, version, f"{digest}.arrow")
+
+    def get(self, version: str, key: Hashable) -> Optional[pa.Table]:
+        path = self.path(version, key)
+        try:
+            with pa.memory_map(path) as source:
+                return pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            return None
+        except pa.ArrowInvalid:
+            # Left behind by a crash mid-write on a filesystem without atomic renames.
+            os.remove(path)
+            return None
+
+    def put(self, version: str, key: Hashable, table: pa.Table):
+        path = self.path(version, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def prune(self, keep_version: str):
+        for entry in os.listdir(self.directory):
+            if entry != keep_version:
+                # Readers that still map an old file keep it until they let go of it.
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+
+class DataVersionCache:
+    """In-memory cache of query results that only new data invalidates.
+
+    Entries belong to the current data version, the id of the last mart build. When
+    the version advances every entry is dropped at once, instead of all of them
+    expiring on a timer. Requests are counted across versions, so prewarm can re-run
+    the most popular keys against a new version before users ask for them. With a
+    store, entries that fall out of memory or predate a restart are read back from
+    disk instead of being loaded again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        prewarm_size: int = 20,
+        store: Optional[ArrowIPCStore] = None,
+    ):
+        self.max_entries = max_entries
+        self.prewarm_size = prewarm_size
+        self.store = store
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._popularity: Counter = Counter()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, 0, self._misses, self._writes, self._evictions)
+
+    def advance(self, version: str) -> bool:
+        """Switch to version, dropping older entries. Returns whether it was new."""
+        with self._lock:
+            if version == self.version:
+                return False
+            self.version = version
+            self._entries.clear()
+            # Halve the request counts so that interest in old data fades out.
+            self._popularity = Counter(
+                {
+                    key: count // 2
+                    for key, count in self._popularity.most_common(self.max_entries)
+                    if count > 1
+                }
+            )
+        if self.store is not None:
+            self.store.prune(version)
+        return True
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        with self._lock:
+            self._popularity[key] += 1
+            if len(self._popularity) > 2 * self.max_entries:
+                # Only keys the cache could hold are worth tracking.
+                self._popularity = Counter(dict(self._popularity.most_common(self.max_entries)))
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._misses += 1
+        return self._load(self.version, key, loader)
+
+    def popular_keys(self) -> List[Hashable]:
+        with self._lock:
+            return [key for key, _ in self._popularity.most_common(self.prewarm_size)]
+
+    def prewarm(self, loader: Callable[[Hashable], Any]) -> int:
+        """Load the most requested keys for the current version; returns how many."""
+        version = self.version
+        warmed = 0
+        for key in self.popular_keys():
+            if self.version != version:
+                break
+            with self._lock:
+                if key in self._entries:
+                    continue
+            self._load(version, key, loader)
+            warmed += 1
+        return warmed
+
+    def _load(
+        self, version: Optional[str], key: Hashable, loader: Callable[[Hashable], Any]
+    ) -> Any:
+        store = self.store if version is not None else None
+        value = store.get(version, key) if store is not None else None
+        if value is None:
+            value = loader(key)
+            if store is not None and self.version == version:
+                store.put(version, key, value)
+        with self._lock:
+            # A result loaded while the version advanced may predate the new data.
+            if self.version == version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                self._writes += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return value
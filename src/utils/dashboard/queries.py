@@ -0,0 +1,362 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from ...resources.database import MotherDuckResource
+from ..replica.helpers import PROJECT_ROOT, ReplicaReader
+
+DEFAULT_QUERY_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", "query_cache")
+
+logger = logging.getLogger(__name__)
+
+
+class QueryParamsError(ValueError):
+    """A named query was called with other params than it declares."""
+
+    def __init__(self, name: str, expected: Tuple[str, ...], given: Dict[str, Any]):
+        super().__init__(f"Query {name} takes {list(expected)}, got {sorted(given)}")
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    name: str
+    sql: str
+    params: Tuple[str, ...] = ()
+
+
+class QueryKey(NamedTuple):
+    """A named query with its normalized parameter values, in declaration order."""
+
+    name: str
+    values: Tuple[Hashable, ...]
+
+
+class QueryTiming(NamedTuple):
+    calls: int
+    total_seconds: float
+    max_seconds: float
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+# Optional filters are written as `$param IS NULL OR ...`, so one statement covers
+# every choice of the dashboard widgets and values are always bound, never formatted in.
+QUERIES: Dict[str, NamedQuery] = {
+    query.name: query
+    for query in [
+        NamedQuery(
+            "date_range",
+            """
+            SELECT MIN(revenue_date) AS earliest_date, MAX(revenue_date) AS latest_date
+            FROM main_marts.fct_daily_revenues
+            """,
+        ),
+        NamedQuery(
+            "top_movies",
+            """
+            SELECT m.title, SUM(f.revenue) AS total_revenue
+            FROM main_marts.fct_daily_revenues f
+            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key AND m.is_current
+            JOIN main_marts.dim_dates d ON f.date_key = d.date_key
+            WHERE ($start_date IS NULL OR d.date >= $start_date)
+              AND ($end_date IS NULL OR d.date <= $end_date)
+            GROUP BY m.title
+            ORDER BY total_revenue DESC
+            LIMIT $row_limit
+            """,
+            ("start_date", "end_date", "row_limit"),
+        ),
+        NamedQuery(
+            "revenue_trend",
+            """
+            SELECT d.date, SUM(f.revenue) AS daily_revenue,
+                   AVG(f.revenue_per_theater) AS avg_revenue_per_theater
+            FROM main_marts.fct_daily_revenues f
+            JOIN main_marts.dim_dates d ON f.date_key = d.date_key
+            JOIN main_marts.dim_distributors dist ON f.distributor_key = dist.distributor_key
+            WHERE ($start_date IS NULL OR d.date >= $start_date)
+              AND ($distributor_category IS NULL
+                   OR dist.distributor_category = $distributor_category)
+            GROUP BY d.date
+            ORDER BY d.date
+            """,
+            ("start_date", "distributor_category"),
+        ),
+        NamedQuery(
+            "distributor_share",
+            """
+            SELECT dist.distributor, SUM(f.revenue) AS total_revenue,
+                   COUNT(DISTINCT m.movie_key) AS movie_count
+            FROM main_marts.fct_daily_revenues f
+            JOIN main_marts.dim_distributors dist ON f.distributor_key = dist.distributor_key
+            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key AND m.is_current
+            GROUP BY dist.distributor
+            ORDER BY total_revenue DESC
+            LIMIT $row_limit
+            """,
+            ("row_limit",),
+        ),
+        NamedQuery(
+            "distributor_details",
+            """
+            SELECT distributor, total_movies, first_appearance_date, last_appearance_date,
+                   total_revenue, avg_revenue_per_movie, distributor_category
+            FROM main_marts.dim_distributors
+            ORDER BY total_revenue DESC
+            LIMIT $row_limit
+            """,
+            ("row_limit",),
+        ),
+        NamedQuery(
+            "movie_titles",
+            "SELECT DISTINCT title FROM main_marts.dim_movies WHERE is_current ORDER BY title",
+        ),
+        NamedQuery(
+            "movie_details",
+            """
+            SELECT m.title, m.year, ARRAY_TO_STRING(m.directors, ', ') AS director,
+                   m.imdb_rating, m.released_date,
+                   SUM(f.revenue) AS total_revenue, AVG(f.theaters) AS avg_theaters,
+                   MAX(f.revenue) AS max_daily_revenue
+            FROM main_marts.fct_daily_revenues f
+            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key AND m.is_current
+            WHERE m.title = $title
+            GROUP BY m.title, m.year, m.directors, m.imdb_rating, m.released_date
+            """,
+            ("title",),
+        ),
+        NamedQuery(
+            "movie_daily_revenue",
+            """
+            SELECT d.date, f.revenue, f.theaters, f.revenue_per_theater
+            FROM main_marts.fct_daily_revenues f
+            JOIN main_marts.dim_dates d ON f.date_key = d.date_key
+            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key AND m.is_current
+            WHERE m.title = $title
+            ORDER BY d.date
+            """,
+            ("title",),
+        ),
+        NamedQuery(
+            "movie_weekly_revenue",
+            """
+            SELECT m.title, wr.year, wr.week_of_year_iso, wr.weekly_revenue,
+                   wr.weekly_theaters, wr.week_start_date, wr.week_end_date,
+                   wr.revenue_change_percentage, wr.drop_percentage, wr.run_stage,
+                   wr.performance_category, wr.cumulative_revenue
+            FROM main_marts.fct_weekly_revenues wr
+            JOIN main_marts.dim_movies m ON wr.movie_key = m.movie_key AND m.is_current
+            WHERE m.title = $title
+            ORDER BY wr.year, wr.week_of_year_iso
+            """,
+            ("title",),
+        ),
+    ]
+}
+
+
+class RollupRoute(NamedTuple):
+    """A rollup mart that can answer a named query in place of the daily facts.
+
+    bind maps the named query's params onto the rollup statement's, or returns None
+    when the request does not line up with the rollup.
+    """
+
+    sql: str
+    bind: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+PERIOD_GRAINS = ("day", "week", "month", "year")
+
+
+def period_buckets(start: date, end: date) -> Dict[str, List[date]]:
+    """Split [start, end] into whole calendar years, months, ISO weeks and days.
+
+    Returns the first day of each period by grain. Weeks are only used within a
+    month, so any range takes at most a few dozen periods however long it is.
+    """
+    buckets: Dict[str, List[date]] = {grain: [] for grain in PERIOD_GRAINS}
+    cursor = start
+    while cursor <= end:
+        next_month = (cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
+        if cursor.month == 1 and cursor.day == 1 and cursor.replace(month=12, day=31) <= end:
+            grain, following = "year", cursor.replace(year=cursor.year + 1)
+        elif cursor.day == 1 and next_month - timedelta(days=1) <= end:
+            grain, following = "month", next_month
+        elif cursor.weekday() == 0 and cursor + timedelta(days=6) <= min(
+            end, next_month - timedelta(days=1)
+        ):
+            grain, following = "week", cursor + timedelta(days=7)
+        else:
+            grain, following = "day", cursor + timedelta(days=1)
+        buckets[grain].append(cursor)
+        cursor = following
+    return buckets
+
+
+def _bind_top_movies(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    start_date, end_date = params["start_date"], params["end_date"]
+    if start_date is None and end_date is None:
+        buckets = {grain: [] for grain in PERIOD_GRAINS}
+    elif start_date is None or end_date is None:
+        return None
+    else:
+        buckets = period_buckets(start_date, end_date)
+    return {
+        "all_time": start_date is None,
+        **{f"{grain}_starts": starts for grain, starts in buckets.items()},
+        "row_limit": params["row_limit"],
+    }
+
+
+# Queries the dbt rollup marts answer without scanning fct_daily_revenues. Marts built
+# before the rollups existed fall back to the queries above.
+ROLLUP_ROUTES: Dict[str, RollupRoute] = {
+    "top_movies": RollupRoute(
+        """
+        SELECT m.title, SUM(r.revenue) AS total_revenue
+        FROM main_marts.agg_movie_revenue_by_period r
+        JOIN main_marts.dim_movies m ON r.movie_key = m.movie_key AND m.is_current
+        WHERE (r.period_grain = 'year'
+               AND ($all_time OR list_contains(CAST($year_starts AS DATE[]), r.period_start)))
+           OR (r.period_grain = 'month'
+               AND list_contains(CAST($month_starts AS DATE[]), r.period_start))
+           OR (r.period_grain = 'week'
+               AND list_contains(CAST($week_starts AS DATE[]), r.period_start))
+           OR (r.period_grain = 'day'
+               AND list_contains(CAST($day_starts AS DATE[]), r.period_start))
+        GROUP BY m.title
+        ORDER BY total_revenue DESC
+        LIMIT $row_limit
+        """,
+        _bind_top_movies,
+    ),
+    "revenue_trend": RollupRoute(
+        """
+        SELECT revenue_date AS date, SUM(revenue) AS daily_revenue,
+               SUM(revenue_per_theater_sum) / SUM(revenue_per_theater_count)
+                   AS avg_revenue_per_theater
+        FROM main_marts.agg_daily_category_revenue
+        WHERE ($start_date IS NULL OR revenue_date >= $start_date)
+          AND ($distributor_category IS NULL OR distributor_category = $distributor_category)
+        GROUP BY revenue_date
+        ORDER BY revenue_date
+        """,
+        dict,
+    ),
+}
+
+
+def get_query_cache_dir() -> str:
+    return os.getenv("CINEMETRICS_QUERY_CACHE_DIR", DEFAULT_QUERY_CACHE_DIR)
+
+
+def normalize_param(value: Any) -> Hashable:
+    """Map equivalent widget values onto one hashable, bindable value."""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        # Dashboard filters are whole days; the time of day would only split the cache.
+        return value.date()
+    if hasattr(value, "item"):
+        # numpy scalars, as pulled out of a DataFrame
+        return value.item()
+    return value
+
+
+def make_key(name: str, **params: Any) -> QueryKey:
+    """The cache key for running the named query with params."""
+    query = QUERIES[name]
+    unknown = set(params) - set(query.params)
+    missing = set(query.params) - set(params)
+    if unknown or missing:
+        raise QueryParamsError(name, query.params, params)
+    return QueryKey(name, tuple(normalize_param(params[param]) for param in query.params))
+
+
+class DashboardQueries:
+    """Runs the named dashboard queries on one shared connection and times them.
+
+    Reads go to the local replica when one has been synced and to MotherDuck
+    otherwise. Every call gets its own cursor of the shared connection, so
+    concurrent Streamlit sessions do not step on each other.
+    """
+
+    def __init__(
+        self,
+        replica: Optional[ReplicaReader],
+        motherduck: MotherDuckResource,
+        slow_query_seconds: float = 1.0,
+    ):
+        self.replica = replica
+        self.motherduck = motherduck
+        self.slow_query_seconds = slow_query_seconds
+        self._timings: Dict[str, QueryTiming] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        cursor = self.replica.cursor() if self.replica is not None else None
+        if cursor is None:
+            with self.motherduck.connection() as conn:
+                yield conn
+            return
+        with cursor:
+            yield cursor
+
+    def run(self, key: QueryKey) -> pa.Table:
+        """Fetch the result as an Arrow table, straight from DuckDB's columnar output.
+
+        Queries with a matching rollup are answered from it.
+        """
+        query = QUERIES[key.name]
+        params = dict(zip(query.params, key.values))
+        route = ROLLUP_ROUTES.get(key.name)
+        rollup_params = route.bind(params) if route is not None else None
+        started = time.perf_counter()
+        with self.connection() as conn:
+            table = None
+            if rollup_params is not None:
+                try:
+                    table = conn.execute(route.sql, rollup_params).arrow()
+                except duckdb.CatalogException:
+                    logger.debug(f"No rollup for {key.name} yet, querying the daily facts")
+            if table is None:
+                table = conn.execute(query.sql, params or None).arrow()
+        self._record(key, time.perf_counter() - started)
+        return _decimals_to_float(table)
+
+    def timings(self) -> Dict[str, QueryTiming]:
+        """Latency per query name since the process started."""
+        with self._lock:
+            return dict(self._timings)
+
+    def _record(self, key: QueryKey, seconds: float):
+        with self._lock:
+            timing = self._timings.get(key.name, QueryTiming(0, 0.0, 0.0))
+            self._timings[key.name] = QueryTiming(
+                timing.calls + 1, timing.total_seconds + seconds, max(timing.max_seconds, seconds)
+            )
+        if seconds >= self.slow_query_seconds:
+            logger.warning(f"Slow dashboard query {key.name}{key.values}: {seconds:.3f}s")
+        else:
+            logger.debug(f"Dashboard query {key.name}{key.values}: {seconds:.3f}s")
+
+
+def _decimals_to_float(table: pa.Table) -> pa.Table:
+    # Revenue sums are DECIMALs, which pandas would turn into columns of Python objects.
+    for i, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+    return table
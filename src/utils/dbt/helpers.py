@@ -0,0 +1,248 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+import duckdb
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+DBT_MANIFEST_PATH = os.path.join(PROJECT_ROOT, "dbt", "target", "manifest.json")
+
+
+class ManifestIndex(NamedTuple):
+    manifest: Dict[str, Any]
+    manifest_hash: str
+    unique_id_by_name: Dict[str, str]
+    unique_ids_by_resource_type: Dict[str, List[str]]
+
+    def node(self, name: str) -> Optional[Dict[str, Any]]:
+        unique_id = self.unique_id_by_name.get(name)
+        if unique_id is None:
+            return None
+        return self.manifest["nodes"].get(unique_id) or self.manifest["sources"].get(unique_id)
+
+
+def _index_manifest(manifest: Dict[str, Any], manifest_hash: str) -> ManifestIndex:
+    unique_id_by_name: Dict[str, str] = {}
+    unique_ids_by_resource_type: Dict[str, List[str]] = {}
+    for section in ("sources", "nodes"):
+        for unique_id, props in manifest.get(section, {}).items():
+            resource_type = props.get("resource_type", section)
+            unique_ids_by_resource_type.setdefault(resource_type, []).append(unique_id)
+            # Models win over sources or tests that happen to share a name.
+            if (
+                resource_type in ("model", "seed", "snapshot")
+                or props["name"] not in unique_id_by_name
+            ):
+                unique_id_by_name[props["name"]] = unique_id
+    return ManifestIndex(manifest, manifest_hash, unique_id_by_name, unique_ids_by_resource_type)
+
+
+def _snapshot_path(manifest_path: str, manifest_hash: str) -> str:
+    base, _ = os.path.splitext(manifest_path)
+    return f"{base}.{manifest_hash[:16]}.pickle"
+
+
+def _write_snapshot(manifest_path: str, index: ManifestIndex):
+    path = _snapshot_path(manifest_path, index.manifest_hash)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only target directory only costs us the snapshot, not the load.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+
+    base, _ = os.path.splitext(manifest_path)
+    for stale in glob.glob(f"{base}.*.pickle"):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+@lru_cache(maxsize=None)
+def _load_manifest_index(
+    manifest_path: str, manifest_hash: str, use_snapshot: bool
+) -> ManifestIndex:
+    snapshot_path = _snapshot_path(manifest_path, manifest_hash)
+    if use_snapshot and os.path.exists(snapshot_path):
+        try:
+            with open(snapshot_path, "rb") as f:
+                index = pickle.load(f)
+            if isinstance(index, ManifestIndex) and index.manifest_hash == manifest_hash:
+                return index
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    with open(manifest_path, "rb") as f:
+        index = _index_manifest(json.loads(f.read()), manifest_hash)
+    if use_snapshot:
+        _write_snapshot(manifest_path, index)
+    return index
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest_index(
+    manifest_path: str = DBT_MANIFEST_PATH, use_snapshot: bool = True
+) -> ManifestIndex:
+    """Parse and index the dbt manifest once per process and content hash.
+
+    Every caller shares the same parsed copy. With use_snapshot, the indexed manifest
+    is also pickled next to manifest.json so later processes skip the JSON parse until
+    dbt rewrites the manifest.
+    """
+    manifest_path = os.path.abspath(manifest_path)
+    return _load_manifest_index(manifest_path, _hash_file(manifest_path), use_snapshot)
+
+
+def load_manifest(
+    manifest_path: str = DBT_MANIFEST_PATH, use_snapshot: bool = True
+) -> Dict[str, Any]:
+    return load_manifest_index(manifest_path, use_snapshot).manifest
+
+
+def get_ancestors(index: ManifestIndex, unique_id: str) -> Set[str]:
+    parent_map = index.manifest["parent_map"]
+    ancestors: Set[str] = set()
+    stack = list(parent_map.get(unique_id, []))
+    while stack:
+        parent = stack.pop()
+        if parent not in ancestors:
+            ancestors.add(parent)
+            stack.extend(parent_map.get(parent, []))
+    return ancestors
+
+
+def topological_order(index: ManifestIndex, unique_ids: List[str]) -> List[str]:
+    """Order the given nodes so that every node comes after its ancestors."""
+    # A node has strictly fewer ancestors than any of its descendants.
+    ancestor_counts = {unique_id: len(get_ancestors(index, unique_id)) for unique_id in unique_ids}
+    return sorted(unique_ids, key=ancestor_counts.__getitem__)
+
+
+FINGERPRINT_TABLE = "dbt_input_fingerprints"
+
+
+class BuildPlan(NamedTuple):
+    fingerprints: Dict[str, str]
+    stale: Dict[str, str]
+    skipped: Dict[str, str]
+
+
+def initialize_fingerprint_table(conn):
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} (
+            unique_id VARCHAR PRIMARY KEY,
+            fingerprint VARCHAR NOT NULL,
+            recorded_at TIMESTAMP NOT NULL
+        )
+    """
+    )
+
+
+def _source_state(conn, source: Dict[str, Any]) -> str:
+    # Append-only sources are summarized by their row count and load watermark;
+    # others fall back to an order-independent hash of every row.
+    loaded_at_field = source.get("loaded_at_field")
+    change_marker = f"MAX({loaded_at_field})" if loaded_at_field else "BIT_XOR(HASH(t))"
+    try:
+        row = conn.execute(
+            f'SELECT COUNT(*), {change_marker} FROM "{source["schema"]}"."{source["identifier"]}" t'
+        ).fetchone()
+    except duckdb.CatalogException:
+        return "missing"
+    return f"{row[0]}:{row[1]}"
+
+
+def compute_input_fingerprints(conn, index: ManifestIndex, unique_ids: List[str]) -> Dict[str, str]:
+    """Fingerprint everything a dbt node's output depends on.
+
+    A model's fingerprint covers its SQL, its config, the macros it calls and the
+    fingerprints of its parents, down to the row count and load watermark (or row
+    hash) of every source. Equal fingerprints mean a rebuild would read the same
+    inputs with the same code.
+    """
+    manifest = index.manifest
+    memo: Dict[str, str] = {}
+
+    def fingerprint(unique_id: str) -> str:
+        if unique_id in memo:
+            return memo[unique_id]
+        if unique_id in manifest["sources"]:
+            parts = [_source_state(conn, manifest["sources"][unique_id])]
+        elif unique_id in manifest["macros"]:
+            macro = manifest["macros"][unique_id]
+            parts = [macro["macro_sql"], *map(fingerprint, macro["depends_on"]["macros"])]
+        else:
+            node = manifest["nodes"][unique_id]
+            depends_on = node.get("depends_on", {})
+            parts = [
+                node["checksum"]["checksum"],
+                json.dumps(node["config"], sort_keys=True, default=str),
+                *map(fingerprint, sorted(depends_on.get("macros", []))),
+                *map(fingerprint, sorted(depends_on.get("nodes", []))),
+            ]
+        memo[unique_id] = hashlib.sha256("\n".join(parts).encode()).hexdigest()
+        return memo[unique_id]
+
+    return {unique_id: fingerprint(unique_id) for unique_id in unique_ids}
+
+
+def plan_dbt_build(conn, index: ManifestIndex, unique_ids: List[str]) -> BuildPlan:
+    """Split the selected dbt nodes into those that must run and those to skip.
+
+    Every node maps to the reason it runs or is skipped.
+    """
+    initialize_fingerprint_table(conn)
+    fingerprints = compute_input_fingerprints(conn, index, unique_ids)
+    recorded = dict(
+        conn.execute(f"SELECT unique_id, fingerprint FROM {FINGERPRINT_TABLE}").fetchall()
+    )
+    relations = set(
+        conn.execute("SELECT table_schema, table_name FROM information_schema.tables").fetchall()
+    )
+
+    stale: Dict[str, str] = {}
+    skipped: Dict[str, str] = {}
+    for unique_id, fingerprint in fingerprints.items():
+        node = index.manifest["nodes"][unique_id]
+        if (node["schema"], node.get("alias") or node["name"]) not in relations:
+            stale[unique_id] = "relation does not exist"
+        elif unique_id not in recorded:
+            stale[unique_id] = "no recorded input fingerprint"
+        elif recorded[unique_id] != fingerprint:
+            stale[unique_id] = "inputs changed since the last build"
+        else:
+            skipped[unique_id] = "inputs unchanged since the last build"
+    return BuildPlan(fingerprints, stale, skipped)
+
+
+def record_fingerprints(conn, fingerprints: Dict[str, str]):
+    if not fingerprints:
+        return
+    conn.execute(
+        f"""
+        INSERT INTO {FINGERPRINT_TABLE} (unique_id, fingerprint, recorded_at)
+        SELECT UNNEST(?::VARCHAR[]), UNNEST(?::VARCHAR[]), current_timestamp
+        ON CONFLICT (unique_id) DO UPDATE SET
+        fingerprint = EXCLUDED.fingerprint,
+        recorded_at = EXCLUDED.recorded_at
+    """,
+        [list(fingerprints), list(fingerprints.values())],
+    )
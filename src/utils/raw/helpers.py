@@ -1,9 +1,16 @@
-from typing import List
+from datetime import date
+from typing import List, NamedTuple
 
 import duckdb
 from dagster import DagsterLogManager
 
 
+class IngestionChunk(NamedTuple):
+    start_date: date
+    end_date: date
+    row_count: int
+
+
 def get_last_ingested_date(conn: duckdb.DuckDBPyConnection, source_table: str) -> str:
     result = conn.execute(
         """
@@ -16,7 +23,7 @@ def get_last_ingested_date(conn: duckdb.DuckDBPyConnection, source_table: str) -
 
 
 def update_ingestion_log(
-    conn: duckdb.DuckDBPyConnection, source_table: str, last_ingested_date: str, record_count: int
+    conn: duckdb.DuckDBPyConnection, source_table: str, last_ingested_date: date, record_count: int
 ):
     conn.execute(
         """
@@ -24,7 +31,7 @@ def update_ingestion_log(
         VALUES (?, ?, ?)
         ON CONFLICT (source_table) DO UPDATE SET
         last_ingested_date = excluded.last_ingested_date,
-        record_count = excluded.record_count
+        record_count = raw_ingestion_log.record_count + excluded.record_count
         """,
         [source_table, last_ingested_date, record_count],
     )
@@ -73,25 +80,73 @@ def log_error(logger: DagsterLogManager, message: str, exception: Exception = No
         logger.error(f"Exception details: {str(exception)}")
 
 
+def plan_ingestion_chunks(
+    conn: duckdb.DuckDBPyConnection,
+    source_table: str,
+    last_processed_date: str,
+    chunk_size: int,
+) -> List[IngestionChunk]:
+    date_counts = conn.execute(
+        f"""
+        SELECT TRY_CAST(date AS DATE) AS revenue_date, COUNT(*) AS row_count
+        FROM main.{source_table}
+        WHERE TRY_CAST(date AS DATE) > TRY_CAST(? AS DATE)
+        GROUP BY revenue_date
+        ORDER BY revenue_date
+        """,
+        [last_processed_date],
+    ).fetchall()
+
+    # A single date is never split, so the watermark always lands on a whole day.
+    chunks = []
+    start_date = previous_date = last_processed_date
+    chunk_rows = 0
+    for revenue_date, row_count in date_counts:
+        if chunk_rows and chunk_rows + row_count > chunk_size:
+            chunks.append(IngestionChunk(start_date, previous_date, chunk_rows))
+            start_date = previous_date
+            chunk_rows = 0
+        chunk_rows += row_count
+        previous_date = revenue_date
+    if chunk_rows:
+        chunks.append(IngestionChunk(start_date, previous_date, chunk_rows))
+    return chunks
+
+
 def insert_new_data(
     conn: duckdb.DuckDBPyConnection,
     config: "ExtractRevenueDataConfig",
     table_structure: List[str],
-    last_processed_date: str,
+    chunk: IngestionChunk,
 ) -> int:
-    columns = ", ".join([f"src.{col}" for col in table_structure])
+    # The (id, date) key is typed once on the batch side. Existing keys are probed only
+    # within the chunk's date range on the uncast DATE column, so the cost follows the
+    # batch size instead of the size of the raw table.
+    columns = ", ".join(
+        [
+            "TRY_CAST(src.date AS DATE) AS date" if col == "date" else f"src.{col}"
+            for col in table_structure
+        ]
+    )
     query = f"""
     WITH new_data AS (
         SELECT {columns}, NOW() as ingestion_timestamp
         FROM main.{config.source_table} src
-        WHERE TRY_CAST(src.date AS DATE) > TRY_CAST(? AS DATE)
+        WHERE TRY_CAST(src.date AS DATE) > ?::DATE
+          AND TRY_CAST(src.date AS DATE) <= ?::DATE
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY src.id, TRY_CAST(src.date AS DATE)) = 1
+    ),
+    existing_keys AS (
+        SELECT id, date
+        FROM {config.target_table}
+        WHERE date > ?::DATE AND date <= ?::DATE
     )
     INSERT INTO {config.target_table}
-    SELECT * FROM new_data
-    WHERE NOT EXISTS (
-        SELECT 1 FROM {config.target_table} tgt
-        WHERE tgt.id = new_data.id AND TRY_CAST(tgt.date AS DATE) = TRY_CAST(new_data.date AS DATE)
-    )
+    SELECT new_data.*
+    FROM new_data
+    ANTI JOIN existing_keys ON existing_keys.id = new_data.id AND existing_keys.date = new_data.date
     """
-    result = conn.execute(query, [last_processed_date])
+    result = conn.execute(
+        query, [chunk.start_date, chunk.end_date, chunk.start_date, chunk.end_date]
+    )
     return result.fetchone()[0]
@@ -0,0 +1,118 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import duckdb
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+DEFAULT_REPLICA_PATH = os.path.join(PROJECT_ROOT, "data", "marts_replica.duckdb")
+REPLICA_SCHEMA = "main_marts"
+
+
+def get_replica_path() -> str:
+    return os.getenv("CINEMETRICS_REPLICA_PATH", DEFAULT_REPLICA_PATH)
+
+
+def export_replica(
+    conn: duckdb.DuckDBPyConnection, path: str, schema: str = REPLICA_SCHEMA
+) -> Dict[str, int]:
+    """Copy every table of schema into a fresh DuckDB file and swap it in at path.
+
+    The copy is written next to the target and renamed over it, so readers never see
+    a half-written replica: connections opened before the swap keep reading the old
+    file, and new ones get the new one. Returns the row count per table.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    _remove_database_file(tmp_path)
+
+    tables = [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = ? AND table_type = 'BASE TABLE'
+            ORDER BY table_name
+            """,
+            [schema],
+        ).fetchall()
+    ]
+    row_counts = {}
+    conn.execute(f"ATTACH '{tmp_path}' AS marts_replica")
+    try:
+        conn.execute(f"CREATE SCHEMA marts_replica.{schema}")
+        for table in tables:
+            conn.execute(
+                f'CREATE TABLE marts_replica.{schema}."{table}" AS SELECT * FROM {schema}."{table}"'
+            )
+            row_counts[table] = conn.execute(
+                f'SELECT COUNT(*) FROM marts_replica.{schema}."{table}"'
+            ).fetchone()[0]
+    except BaseException:
+        conn.execute("DETACH marts_replica")
+        _remove_database_file(tmp_path)
+        raise
+    conn.execute("DETACH marts_replica")
+    os.replace(tmp_path, path)
+    return row_counts
+
+
+class ReplicaReader:
+    """Read-only handle on the local replica that follows its atomic swaps.
+
+    Safe to share between threads: cursor() hands each caller its own cursor, and
+    reopens the replica first if a sync has swapped in a new file since.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_replica_path()
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._version: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def cursor(self) -> Optional[duckdb.DuckDBPyConnection]:
+        """A cursor on the newest replica, or None if none has been synced yet."""
+        version = self.file_version()
+        with self._lock:
+            if version != self._version:
+                # duckdb.connect() would hand back the cached instance of the swapped-out
+                # file, so each version is attached to its own in-memory database instead.
+                # Cursors handed out earlier keep the old connection alive until closed.
+                self._conn = self._attach() if version else None
+                self._version = version
+            if self._conn is None:
+                return None
+        cursor = self._conn.cursor()
+        cursor.execute("USE replica")
+        return cursor
+
+    def _attach(self) -> duckdb.DuckDBPyConnection:
+        conn = duckdb.connect()
+        conn.execute(f"ATTACH '{self.path}' AS replica (READ_ONLY)")
+        return conn
+
+
+def get_build_id(conn: duckdb.DuckDBPyConnection, schema: str = REPLICA_SCHEMA) -> Optional[str]:
+    """The id of the last dbt invocation that built the marts, if one was recorded."""
+    try:
+        row = conn.execute(
+            f"SELECT build_id FROM {schema}.marts_builds ORDER BY built_at DESC LIMIT 1"
+        ).fetchone()
+    except duckdb.CatalogException:
+        return None
+    return row[0] if row else None
+
+
+def _remove_database_file(path: str):
+    for stale in (path, f"{path}.wal"):
+        if os.path.exists(stale):
+            os.remove(stale)
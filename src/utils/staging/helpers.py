@@ -1,19 +1,58 @@
 import asyncio
 import json
-from datetime import date
-from typing import Any, Dict, List, NamedTuple, Tuple
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import aiohttp
 from dagster import AssetExecutionContext
 
 from src.resources.external import APILimitReachedException
 
+OMDB_REFRESH_DAYS = 7
+NEVER_FETCHED_DATE = date(1900, 1, 1)
+
 
 class MovieToFetch(NamedTuple):
     clean_title: str
     max_date: date
 
 
+class FetchResult(NamedTuple):
+    clean_title: str
+    data: Optional[Dict[str, Any]]
+
+
+def _split_list(field: str) -> str:
+    return (
+        f"CASE WHEN data->>'{field}' NOT IN ('', 'N/A') THEN "
+        f"list_transform(string_split(data->>'{field}', ','), name -> TRIM(name)) END"
+    )
+
+
+# Typed projection of the OMDb payload, parsed once when a response is written so
+# that dbt models read plain columns instead of re-parsing JSON on every build.
+# OMDb reports missing values as "N/A", which every cast below maps to NULL.
+OMDB_TYPED_COLUMNS = {
+    "title": "NULLIF(data->>'Title', 'N/A')",
+    # Series report year ranges such as "2019–2021"; only single years are kept.
+    "year": "TRY_CAST(NULLIF(REGEXP_EXTRACT(data->>'Year', '^(\\d{4})$', 1), '') AS INTEGER)",
+    "rated": "NULLIF(data->>'Rated', 'N/A')",
+    "released_date": (
+        "COALESCE(TRY_STRPTIME(data->>'Released', '%d %b %Y')::DATE,"
+        " TRY_CAST(data->>'Released' AS DATE))"
+    ),
+    "runtime_minutes": "TRY_CAST(REGEXP_EXTRACT(data->>'Runtime', '(\\d+)') AS INTEGER)",
+    "directors": _split_list("Director"),
+    "actors": _split_list("Actors"),
+    "box_office_total": (
+        "TRY_CAST(REPLACE(REPLACE(data->>'BoxOffice', '$', ''), ',', '') AS DECIMAL(18,2))"
+    ),
+    "imdb_rating": "TRY_CAST(data->>'imdbRating' AS DECIMAL(3,1))",
+    "imdb_votes": "TRY_CAST(REPLACE(data->>'imdbVotes', ',', '') AS INTEGER)",
+}
+
+
 def initialize_tables(database):
     database.execute(
         """
@@ -24,6 +63,29 @@ def initialize_tables(database):
         )
     """
     )
+    # DuckDB cannot update list columns on conflict, so stg_omdb_movies has no primary
+    # key and replace_omdb_movies swaps rows by deleting and re-inserting them.
+    database.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stg_omdb_movies (
+            imdb_id VARCHAR NOT NULL,
+            title VARCHAR,
+            year INTEGER,
+            rated VARCHAR,
+            released_date DATE,
+            runtime_minutes INTEGER,
+            directors VARCHAR[],
+            actors VARCHAR[],
+            box_office_total DECIMAL(18,2),
+            imdb_rating DECIMAL(3,1),
+            imdb_votes INTEGER,
+            last_updated DATE
+        )
+    """
+    )
+    # Backfills responses fetched before the typed table existed.
+    with database.connection() as conn:
+        replace_omdb_movies(conn, "imdb_id NOT IN (SELECT imdb_id FROM stg_omdb_movies)", [])
     database.execute(
         """
         CREATE TABLE IF NOT EXISTS stg_omdb_api_usage_log (
@@ -32,19 +94,65 @@ def initialize_tables(database):
         )
     """
     )
-
-
-def insert_omdb_data(database, imdb_id: str, data: Dict[str, Any], current_date: date):
+    # Kept apart from the dbt-built stg_movies_to_fetch so that rebuilding the model
+    # never resets fetch history. DuckDB cannot update indexed columns of a table with
+    # a primary key, so clean_title uniqueness is enforced by sync_fetch_state instead.
     database.execute(
         """
-        INSERT INTO stg_omdb_raw_data (imdb_id, data, last_updated)
-        VALUES (?, ?, ?)
-        ON CONFLICT (imdb_id) DO UPDATE SET
-        data = EXCLUDED.data,
-        last_updated = EXCLUDED.last_updated
-    """,
-        [imdb_id, json.dumps(data), current_date],
+        CREATE TABLE IF NOT EXISTS omdb_fetch_state (
+            clean_title VARCHAR NOT NULL,
+            max_date DATE,
+            omdb_last_fetched_date DATE,
+            omdb_last_error_date DATE,
+            next_fetch_date DATE NOT NULL
+        )
+    """
+    )
+    database.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_omdb_fetch_state_next_fetch_date
+        ON omdb_fetch_state(next_fetch_date)
+    """
+    )
+
+
+def sync_fetch_state(database) -> int:
+    with database.connection() as conn:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            new_titles = conn.execute(
+                """
+                INSERT INTO omdb_fetch_state (clean_title, max_date, next_fetch_date)
+                SELECT m.clean_title, m.max_date, ?
+                FROM stg_movies_to_fetch m
+                WHERE m.clean_title IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM omdb_fetch_state s WHERE s.clean_title = m.clean_title
+                  )
+            """,
+                [NEVER_FETCHED_DATE],
+            ).fetchone()[0]
+            conn.execute(
+                """
+                UPDATE omdb_fetch_state
+                SET max_date = m.max_date
+                FROM stg_movies_to_fetch m
+                WHERE omdb_fetch_state.clean_title = m.clean_title
+                  AND omdb_fetch_state.max_date IS DISTINCT FROM m.max_date
+            """
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return new_titles
+
+
+def get_api_usage(database, current_date: date) -> int:
+    result = database.query(
+        "SELECT request_count FROM stg_omdb_api_usage_log WHERE date = ?", [current_date]
     )
+    return result[0][0] if result and result[0][0] else 0
 
 
 def update_api_usage_log(database, current_date: date, request_count: int):
@@ -59,39 +167,146 @@ def update_api_usage_log(database, current_date: date, request_count: int):
     )
 
 
-def update_fetch_date(database, clean_title: str, current_date: date):
-    database.execute(
-        """
-        UPDATE stg_movies_to_fetch
-        SET omdb_last_fetched_date = ?
-        WHERE clean_title = ?
+def replace_omdb_movies(conn, condition: str, params: List[Any]):
+    """Re-parse the stg_omdb_raw_data rows matching condition into stg_omdb_movies."""
+    conn.execute(f"DELETE FROM stg_omdb_movies WHERE {condition}", params)
+    conn.execute(
+        f"""
+        INSERT INTO stg_omdb_movies (imdb_id, {", ".join(OMDB_TYPED_COLUMNS)}, last_updated)
+        SELECT
+            imdb_id,
+            {", ".join(f"{expression} AS {name}" for name, expression in OMDB_TYPED_COLUMNS.items())},
+            last_updated
+        FROM stg_omdb_raw_data
+        WHERE {condition}
     """,
-        [current_date, clean_title],
+        params,
     )
 
 
-def update_error_date(database, clean_title: str, current_date: date):
-    database.execute(
-        """
-        UPDATE stg_movies_to_fetch
-        SET omdb_last_error_date = ?
-        WHERE clean_title = ?
-    """,
-        [current_date, clean_title],
-    )
+def write_omdb_batch(database, results: List[FetchResult], current_date: date):
+    movies = {result.data["imdbID"]: result.data for result in results if result.data}
+    fetch_dates = {
+        result.clean_title: (current_date, None) if result.data else (None, current_date)
+        for result in results
+    }
+    titles = list(fetch_dates)
+
+    with database.connection() as conn:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            if movies:
+                conn.execute(
+                    """
+                    INSERT INTO stg_omdb_raw_data (imdb_id, data, last_updated)
+                    SELECT UNNEST(?::VARCHAR[]), UNNEST(?::JSON[]), ?::DATE
+                    ON CONFLICT (imdb_id) DO UPDATE SET
+                    data = EXCLUDED.data,
+                    last_updated = EXCLUDED.last_updated
+                """,
+                    [list(movies), [json.dumps(data) for data in movies.values()], current_date],
+                )
+                replace_omdb_movies(
+                    conn, "imdb_id IN (SELECT UNNEST(?::VARCHAR[]))", [list(movies)]
+                )
+            conn.execute(
+                """
+                UPDATE omdb_fetch_state
+                SET omdb_last_fetched_date = COALESCE(batch.fetched_date, omdb_last_fetched_date),
+                    omdb_last_error_date = COALESCE(batch.error_date, omdb_last_error_date),
+                    next_fetch_date = batch.next_fetch_date
+                FROM (
+                    SELECT
+                        UNNEST(?::VARCHAR[]) AS clean_title,
+                        UNNEST(?::DATE[]) AS fetched_date,
+                        UNNEST(?::DATE[]) AS error_date,
+                        ?::DATE AS next_fetch_date
+                ) AS batch
+                WHERE omdb_fetch_state.clean_title = batch.clean_title
+            """,
+                [
+                    titles,
+                    [fetch_dates[title][0] for title in titles],
+                    [fetch_dates[title][1] for title in titles],
+                    current_date + timedelta(days=OMDB_REFRESH_DAYS),
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
 
+class OMDbBatchWriter:
+    def __init__(
+        self,
+        database,
+        current_date: date,
+        batch_size: int = 500,
+        flush_interval: float = 30.0,
+    ):
+        self.database = database
+        self.current_date = current_date
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.flush_count = 0
+        self._buffer: List[FetchResult] = []
+        self._last_flush = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+
+    async def add(self, clean_title: str, data: Optional[Dict[str, Any]]):
+        self._buffer.append(FetchResult(clean_title, data))
+        if (
+            len(self._buffer) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if not batch:
+                return
+            try:
+                await self.database.run_async(
+                    write_omdb_batch, self.database, batch, self.current_date
+                )
+            except BaseException:
+                # Keep the batch so the final flush can retry it.
+                self._buffer = batch + self._buffer
+                raise
+            self.rows_written += len(batch)
+            self.flush_count += 1
+
+
+def get_titles_to_fetch(
+    database,
+    current_date: date,
+    after: Optional[MovieToFetch] = None,
+    limit: int = 500,
+) -> List[MovieToFetch]:
+    # Keyset pagination: rows written back while paging cannot shift later pages.
+    keyset_condition = ""
+    params: List[Any] = [current_date]
+    if after is not None:
+        keyset_condition = "AND (max_date < ? OR (max_date = ? AND clean_title > ?))"
+        params += [after.max_date, after.max_date, after.clean_title]
 
-def get_titles_to_fetch(database, seven_days_ago: date) -> List[MovieToFetch]:
     results = database.query(
-        """
+        f"""
         SELECT clean_title, max_date
-        FROM stg_movies_to_fetch
-        WHERE (omdb_last_fetched_date IS NULL AND omdb_last_error_date IS NULL)
-           OR (omdb_last_fetched_date < ? AND (omdb_last_error_date IS NULL OR omdb_last_error_date < ?))
-           OR (omdb_last_fetched_date IS NULL AND omdb_last_error_date < ?)
-        ORDER BY max_date DESC
+        FROM (
+            SELECT clean_title, COALESCE(max_date, DATE '1900-01-01') AS max_date
+            FROM omdb_fetch_state
+            WHERE next_fetch_date < ?
+        )
+        WHERE TRUE {keyset_condition}
+        ORDER BY max_date DESC, clean_title
+        LIMIT {int(limit)}
     """,
-        [seven_days_ago, seven_days_ago, seven_days_ago],
+        params,
     )
     return [MovieToFetch(*row) for row in results]
 
@@ -99,22 +314,13 @@ def get_titles_to_fetch(database, seven_days_ago: date) -> List[MovieToFetch]:
 async def process_single_movie(
     context: AssetExecutionContext,
     omdb_api,
-    database,
+    writer: OMDbBatchWriter,
     session,
     movie: MovieToFetch,
-    current_date: date,
-) -> Tuple[bool, int]:
+) -> bool:
+    result = None
     try:
         result = await omdb_api.fetch_movie_data(context, session, movie.clean_title)
-        if result:
-            await database.run_async(
-                insert_omdb_data, database, result["imdbID"], result, current_date
-            )
-            await database.run_async(update_fetch_date, database, movie.clean_title, current_date)
-            return True, 1
-        else:
-            await database.run_async(update_error_date, database, movie.clean_title, current_date)
-            return False, 1
     except APILimitReachedException:
         raise
     except aiohttp.ClientError as e:
@@ -122,8 +328,8 @@ async def process_single_movie(
     except Exception as e:
         context.log.error(f"Unexpected error processing movie {movie.clean_title}: {str(e)}")
 
-    await database.run_async(update_error_date, database, movie.clean_title, current_date)
-    return False, 1
+    await writer.add(movie.clean_title, result)
+    return bool(result)
 
 
 async def process_movies(
@@ -131,36 +337,60 @@ async def process_movies(
     omdb_api,
     database,
     session,
-    titles_to_fetch: List[MovieToFetch],
     current_date: date,
+    page_size: int = 500,
 ) -> Tuple[int, int]:
-    semaphore = asyncio.Semaphore(10)
+    rate_limiter = omdb_api.get_rate_limiter()
+    requests_before = rate_limiter.requests_sent
+    writer = OMDbBatchWriter(database, current_date)
+    worker_count = omdb_api.max_concurrency
+    queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+    stop = asyncio.Event()
     processed_count = 0
-    total_requests = 0
-    fetch_tasks = []
-
-    async def process_with_semaphore(movie):
-        nonlocal processed_count, total_requests
-        async with semaphore:
-            success, requests = await process_single_movie(
-                context, omdb_api, database, session, movie, current_date
+
+    async def produce():
+        last_movie = None
+        while not stop.is_set() and not rate_limiter.exhausted:
+            page = await database.run_async(
+                get_titles_to_fetch, database, current_date, last_movie, page_size
             )
-            if success:
-                processed_count += 1
-            total_requests += requests
-            return success, requests
+            for movie in page:
+                if stop.is_set() or rate_limiter.exhausted:
+                    break
+                await queue.put(movie)
+            if len(page) < page_size:
+                break
+            last_movie = page[-1]
+        for _ in range(worker_count):
+            await queue.put(None)
 
-    for movie in titles_to_fetch:
-        task = asyncio.create_task(process_with_semaphore(movie))
-        fetch_tasks.append(task)
+    async def work():
+        nonlocal processed_count
+        while not stop.is_set():
+            movie = await queue.get()
+            if movie is None:
+                return
+            try:
+                if await process_single_movie(context, omdb_api, writer, session, movie):
+                    processed_count += 1
+            except APILimitReachedException as e:
+                if not stop.is_set():
+                    context.log.warning(f"API Limit reached during processing: {str(e)}")
+                stop.set()
 
+    producer = asyncio.create_task(produce())
+    workers = [asyncio.create_task(work()) for _ in range(worker_count)]
     try:
-        await asyncio.gather(*fetch_tasks)
-    except APILimitReachedException as e:
-        context.log.warning(f"API Limit reached during processing: {str(e)}")
-        for task in fetch_tasks:
+        await asyncio.gather(*workers)
+    finally:
+        for task in [producer, *workers]:
             if not task.done():
                 task.cancel()
-        await asyncio.gather(*fetch_tasks, return_exceptions=True)
+        await asyncio.gather(producer, *workers, return_exceptions=True)
+        # Results gathered before an abort or cancellation must still be persisted.
+        await asyncio.shield(writer.flush())
+        context.log.info(
+            f"Wrote {writer.rows_written} OMDb results in {writer.flush_count} batches"
+        )
 
-    return processed_count, total_requests
+    return processed_count, rate_limiter.requests_sent - requests_before
@@ -1,5 +1,9 @@
+import logging
 import os
+import threading
+import time
 from datetime import timedelta
+from typing import Optional
 
 import pandas as pd
 import plotly.express as px
@@ -9,6 +13,9 @@ from streamlit_extras.chart_container import chart_container
 
 import streamlit as st
 from src.resources.database import MotherDuckResource
+from src.utils.dashboard.cache import ArrowIPCStore, DataVersionCache
+from src.utils.dashboard.queries import DashboardQueries, get_query_cache_dir, make_key
+from src.utils.replica.helpers import ReplicaReader, get_build_id
 
 # Page configuration
 st.set_page_config(page_title="CineMetrics Dashboard", page_icon="🎬", layout="wide")
@@ -16,28 +23,83 @@ st.set_page_config(page_title="CineMetrics Dashboard", page_icon="🎬", layout=
 # Load environment variables
 load_dotenv()
 
-# Initialize database connection
-motherduck_resource = MotherDuckResource(
-    connection_string=os.getenv("MOTHERDUCK_CONNECTION_STRING"), token=os.getenv("MOTHERDUCK_TOKEN")
-)
+# "local" reads the replica synced by the marts_replica asset and falls back to
+# MotherDuck until one exists; "remote" always queries MotherDuck.
+DASHBOARD_SOURCE = os.getenv("CINEMETRICS_DASHBOARD_SOURCE", "local")
+DATA_VERSION_POLL_SECONDS = float(os.getenv("CINEMETRICS_DATA_VERSION_POLL_SECONDS", "15"))
+SLOW_QUERY_SECONDS = float(os.getenv("CINEMETRICS_SLOW_QUERY_SECONDS", "1"))
 
+logger = logging.getLogger(__name__)
 
-# Function to load data with caching
-@st.cache_data(ttl=3600)
-def load_data(query: str) -> pd.DataFrame:
-    with motherduck_resource.connection() as conn:
-        return pd.read_sql_query(query, conn)
+
+# Initialize database connection pool once per Streamlit process
+@st.cache_resource
+def get_motherduck_resource() -> MotherDuckResource:
+    return MotherDuckResource(
+        connection_string=os.getenv("MOTHERDUCK_CONNECTION_STRING"),
+        token=os.getenv("MOTHERDUCK_TOKEN"),
+    )
+
+
+@st.cache_resource
+def get_replica_reader() -> Optional[ReplicaReader]:
+    return ReplicaReader() if DASHBOARD_SOURCE == "local" else None
+
+
+# One set of named, parameterized queries on connections shared by every session
+@st.cache_resource
+def get_dashboard_queries() -> DashboardQueries:
+    return DashboardQueries(
+        get_replica_reader(), get_motherduck_resource(), slow_query_seconds=SLOW_QUERY_SECONDS
+    )
+
+
+def read_data_version(queries: DashboardQueries) -> str:
+    with queries.connection() as conn:
+        build_id = get_build_id(conn)
+    # Marts built before build ids were recorded fall back to hourly versions.
+    return build_id or f"unversioned-{int(time.time() // 3600)}"
+
+
+def watch_data_version(cache: DataVersionCache, queries: DashboardQueries):
+    while True:
+        time.sleep(DATA_VERSION_POLL_SECONDS)
+        try:
+            if cache.advance(read_data_version(queries)):
+                warmed = cache.prewarm(queries.run)
+                logger.info(f"Marts version {cache.version}: pre-warmed {warmed} queries")
+        except Exception:
+            logger.exception("Could not refresh the marts data version")
+
+
+# Query results are cached until the next mart build. A background thread polls the
+# build id and re-runs the most requested queries as soon as it changes.
+@st.cache_resource
+def get_query_cache() -> DataVersionCache:
+    queries = get_dashboard_queries()
+    cache = DataVersionCache(store=ArrowIPCStore(get_query_cache_dir()))
+    cache.advance(read_data_version(queries))
+    threading.Thread(
+        target=watch_data_version,
+        args=(cache, queries),
+        name="data-version-watcher",
+        daemon=True,
+    ).start()
+    return cache
+
+
+# Function to load data with caching, keyed on the query name and normalized params.
+# Results are cached as Arrow tables; plotly express and Styler still want pandas.
+def load_data(name: str, **params) -> pd.DataFrame:
+    table = get_query_cache().get_or_load(make_key(name, **params), get_dashboard_queries().run)
+    return table.to_pandas(date_as_object=False)
 
 
 def main():
     st.title("🎬 CineMetrics Dashboard")
 
     # Fetch the latest date
-    query_dates = """
-        SELECT MIN(revenue_date) as earliest_date, MAX(revenue_date) as latest_date
-        FROM main_marts.fct_daily_revenues
-    """
-    df_dates = load_data(query_dates)
+    df_dates = load_data("date_range")
     earliest_date = df_dates["earliest_date"].iloc[0]
     latest_date = df_dates["latest_date"].iloc[0]
 
@@ -60,57 +122,23 @@ def main():
 
     limit = 10 if display_type == "Top 10" else 20
 
+    end_date = latest_date
     if period == "Last Week":
         start_date = latest_date - timedelta(days=7)
-        query = f"""
-            SELECT m.title, SUM(f.revenue) as total_revenue
-            FROM main_marts.fct_daily_revenues f
-            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-            JOIN main_marts.dim_dates d ON f.date_key = d.date_key
-            WHERE d.date BETWEEN '{start_date}'::DATE AND '{latest_date}'::DATE
-            GROUP BY m.title
-            ORDER BY total_revenue DESC
-            LIMIT {limit}
-        """
         title = f"Top {limit} Movies by Revenue - Last Week ({start_date.strftime('%Y-%m-%d')} to {latest_date.strftime('%Y-%m-%d')})"
     elif period == "Last Month":
         start_date = latest_date.replace(day=1)
-        query = f"""
-            SELECT m.title, SUM(f.revenue) as total_revenue
-            FROM main_marts.fct_daily_revenues f
-            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-            JOIN main_marts.dim_dates d ON f.date_key = d.date_key
-            WHERE d.date BETWEEN '{start_date}'::DATE AND '{latest_date}'::DATE
-            GROUP BY m.title
-            ORDER BY total_revenue DESC
-            LIMIT {limit}
-        """
         title = f"Top {limit} Movies by Revenue - Last Month ({start_date.strftime('%B %Y')})"
     elif period == "Last Year":
         start_date = latest_date.replace(year=latest_date.year - 1)
-        query = f"""
-            SELECT m.title, SUM(f.revenue) as total_revenue
-            FROM main_marts.fct_daily_revenues f
-            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-            JOIN main_marts.dim_dates d ON f.date_key = d.date_key
-            WHERE d.date BETWEEN '{start_date}'::DATE AND '{latest_date}'::DATE
-            GROUP BY m.title
-            ORDER BY total_revenue DESC
-            LIMIT {limit}
-        """
         title = f"Top {limit} Movies by Revenue - Last Year ({start_date.strftime('%Y')})"
     else:
-        query = f"""
-            SELECT m.title, SUM(f.revenue) as total_revenue
-            FROM main_marts.fct_daily_revenues f
-            JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-            GROUP BY m.title
-            ORDER BY total_revenue DESC
-            LIMIT {limit}
-        """
+        start_date = end_date = None
         title = f"Top {limit} Movies by Revenue - All Time"
 
-    df_top_movies = load_data(query)
+    df_top_movies = load_data(
+        "top_movies", start_date=start_date, end_date=end_date, row_limit=limit
+    )
 
     with chart_container(df_top_movies):
         fig = px.bar(
@@ -150,25 +178,12 @@ def main():
     else:
         start_date = None
 
-    date_condition = f"WHERE d.date >= '{start_date}'::DATE" if start_date else ""
-    category_condition = (
-        f"AND dist.distributor_category = '{distributor_category}'"
-        if distributor_category != "All"
-        else ""
+    df_trend = load_data(
+        "revenue_trend",
+        start_date=start_date,
+        distributor_category=None if distributor_category == "All" else distributor_category,
     )
 
-    query = f"""
-        SELECT d.date, SUM(f.revenue) as daily_revenue, AVG(f.revenue_per_theater) as avg_revenue_per_theater
-        FROM main_marts.fct_daily_revenues f
-        JOIN main_marts.dim_dates d ON f.date_key = d.date_key
-        JOIN main_marts.dim_distributors dist ON f.distributor_key = dist.distributor_key
-        {date_condition}
-        {category_condition}
-        GROUP BY d.date
-        ORDER BY d.date
-    """
-    df_trend = load_data(query)
-
     with chart_container(df_trend):
         fig = go.Figure()
         fig.add_trace(
@@ -198,16 +213,7 @@ def main():
     col1, col2 = st.columns(2)
 
     with col1:
-        query = """
-        SELECT dist.distributor, SUM(f.revenue) as total_revenue, COUNT(DISTINCT m.movie_key) as movie_count
-        FROM main_marts.fct_daily_revenues f
-        JOIN main_marts.dim_distributors dist ON f.distributor_key = dist.distributor_key
-        JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-        GROUP BY dist.distributor
-        ORDER BY total_revenue DESC
-        LIMIT 10
-        """
-        df_distributors = load_data(query)
+        df_distributors = load_data("distributor_share", row_limit=10)
 
         with chart_container(df_distributors):
             fig = px.pie(
@@ -238,14 +244,7 @@ def main():
     # Section 4: Detailed Distributor Analysis
     st.header("🏢 Detailed Distributor Analysis")
 
-    query = """
-    SELECT distributor, total_movies, first_appearance_date, last_appearance_date,
-           total_revenue, avg_revenue_per_movie, distributor_category
-    FROM main_marts.dim_distributors
-    ORDER BY total_revenue DESC
-    LIMIT 20
-    """
-    df_distributor_details = load_data(query)
+    df_distributor_details = load_data("distributor_details", row_limit=20)
 
     st.dataframe(
         df_distributor_details.style.format(
@@ -274,21 +273,11 @@ def main():
     # Section 5: Single Movie Analysis
     st.header("🎥 Single Movie Analysis")
 
-    query = "SELECT DISTINCT title FROM main_marts.dim_movies ORDER BY title"
-    df_movies = load_data(query)
+    df_movies = load_data("movie_titles")
 
     selected_movie = st.selectbox("Select a movie", df_movies["title"], key="movie_select")
 
-    query = f"""
-    SELECT m.title, m.year, m.director, m.imdb_rating, m.released_date,
-           SUM(f.revenue) as total_revenue, AVG(f.theaters) as avg_theaters,
-           MAX(f.revenue) as max_daily_revenue
-    FROM main_marts.fct_daily_revenues f
-    JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-    WHERE m.title = '{selected_movie}'
-    GROUP BY m.title, m.year, m.director, m.imdb_rating, m.released_date
-    """
-    df_movie_details = load_data(query)
+    df_movie_details = load_data("movie_details", title=selected_movie)
 
     if not df_movie_details.empty:
         movie = df_movie_details.iloc[0]
@@ -322,15 +311,7 @@ def main():
             f"**Release Date:** {movie['released_date'].strftime('%Y-%m-%d') if pd.notnull(movie['released_date']) else 'N/A'}"
         )
 
-        query = f"""
-        SELECT d.date, f.revenue, f.theaters, f.revenue_per_theater
-        FROM main_marts.fct_daily_revenues f
-        JOIN main_marts.dim_dates d ON f.date_key = d.date_key
-        JOIN main_marts.dim_movies m ON f.movie_key = m.movie_key
-        WHERE m.title = '{selected_movie}'
-        ORDER BY d.date
-        """
-        df_movie_revenue = load_data(query)
+        df_movie_revenue = load_data("movie_daily_revenue", title=selected_movie)
 
         fig = go.Figure()
         fig.add_trace(
@@ -366,16 +347,7 @@ def main():
         "Select a movie for weekly analysis", df_movies["title"], key="weekly_movie_select"
     )
 
-    query = f"""
-    SELECT m.title, wr.year, wr.week_of_year_iso, wr.weekly_revenue, wr.weekly_theaters,
-           wr.week_start_date, wr.week_end_date, wr.revenue_change_percentage, wr.drop_percentage,
-           wr.run_stage, wr.performance_category, wr.cumulative_revenue
-    FROM main_marts.fct_weekly_revenues wr
-    JOIN main_marts.dim_movies m ON wr.movie_key = m.movie_key
-    WHERE m.title = '{selected_movie_weekly}'
-    ORDER BY wr.year, wr.week_of_year_iso
-    """
-    df_weekly_revenue = load_data(query)
+    df_weekly_revenue = load_data("movie_weekly_revenue", title=selected_movie_weekly)
 
     if not df_weekly_revenue.empty:
         fig = go.Figure()
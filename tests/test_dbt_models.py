@@ -0,0 +1,106 @@
+import os
+
+import duckdb
+from dagster import AssetKey, DagsterInstance, Output, asset, materialize
+from dagster_dbt import DbtCliResource
+
+from src.assets.dbt_models import cinemetrics_dbt_assets
+from src.resources.database import MotherDuckResource
+from src.utils.dbt.helpers import PROJECT_ROOT, load_manifest_index, topological_order
+
+DOWNSTREAM_DEP = AssetKey(["marts", "fct_daily_revenues"])
+
+
+class FakeDbtInvocation:
+    def __init__(self, events):
+        self._events = events
+
+    def stream(self):
+        yield from self._events
+
+
+class FakeDbtCliResource(DbtCliResource):
+    """Builds every selected, non-excluded model as an empty table instead of running dbt."""
+
+    database_path: str
+
+    def cli(self, args, *, context=None, **kwargs):
+        excluded = set(args[args.index("--exclude") + 1 :]) if "--exclude" in args else set()
+        # Like dbt, emit outputs in dependency order.
+        index = load_manifest_index()
+        key_by_unique_id = {
+            index.unique_id_by_name[key.path[-1]]: key for key in context.selected_asset_keys
+        }
+        events = []
+        with duckdb.connect(self.database_path) as conn:
+            for unique_id in topological_order(index, list(key_by_unique_id)):
+                node = index.manifest["nodes"][unique_id]
+                if node["name"] in excluded:
+                    continue
+                relation = f'"{node["schema"]}"."{node.get("alias") or node["name"]}"'
+                conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{node["schema"]}"')
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {relation} AS SELECT 1 AS id")
+                output_name = context.assets_def.get_output_name_for_asset_key(
+                    key_by_unique_id[unique_id]
+                )
+                events.append(Output(None, output_name=output_name))
+        return FakeDbtInvocation(events)
+
+
+@asset(deps=[DOWNSTREAM_DEP])
+def downstream_of_marts() -> None:
+    pass
+
+
+def _materialize(instance, database_path):
+    resources = {
+        "dbt": FakeDbtCliResource(
+            project_dir=os.path.join(PROJECT_ROOT, "dbt"), database_path=database_path
+        ),
+        "database": MotherDuckResource(connection_string=database_path, token=""),
+    }
+    return materialize(
+        [cinemetrics_dbt_assets, downstream_of_marts], instance=instance, resources=resources
+    )
+
+
+def _materializations(result):
+    return {
+        event.asset_key: event.step_materialization_data.materialization
+        for event in result.get_asset_materialization_events()
+    }
+
+
+def test_unchanged_models_still_materialize_downstream(tmp_path):
+    instance = DagsterInstance.ephemeral()
+    database_path = str(tmp_path / "marts.duckdb")
+
+    first = _materialize(instance, database_path)
+    assert first.success
+    assert AssetKey("downstream_of_marts") in _materializations(first)
+
+    second = _materialize(instance, database_path)
+    assert second.success
+    materializations = _materializations(second)
+    assert AssetKey("downstream_of_marts") in materializations
+    skipped = materializations[DOWNSTREAM_DEP].metadata
+    assert skipped["dbt_skipped"].value is True
+    assert skipped["skip_reason"].value
+
+
+def test_unchanged_models_follow_their_rebuilt_parents(tmp_path):
+    instance = DagsterInstance.ephemeral()
+    database_path = str(tmp_path / "marts.duckdb")
+    assert _materialize(instance, database_path).success
+
+    # A dropped relation is rebuilt while its unchanged descendants are skipped.
+    node = load_manifest_index().node("stg_revenue_per_day")
+    with duckdb.connect(database_path) as conn:
+        conn.execute(f'DROP TABLE "{node["schema"]}"."{node.get("alias") or node["name"]}"')
+
+    result = _materialize(instance, database_path)
+    assert result.success
+    materializations = _materializations(result)
+    assert "dbt_skipped" not in materializations[AssetKey("stg_revenue_per_day")].metadata
+    assert materializations[DOWNSTREAM_DEP].metadata["dbt_skipped"].value is True
+    assert AssetKey("downstream_of_marts") in materializations